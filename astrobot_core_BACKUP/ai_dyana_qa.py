@@ -129,10 +129,8 @@ def kb_retrieve_for_dyana(
     In futuro: query su Supabase / vettoriale.
     Ora: stub che mostra quali tag userebbe.
     """
-    combined: List[str] = []
-    for tag in (question_tags + reading_tags):
-        if tag not in combined:
-            combined.append(tag)
+    # dedup mantenendo l'ordine (dict preserva l'ordine di inserimento)
+    combined: List[str] = list(dict.fromkeys(question_tags + reading_tags))
 
     docs: List[str] = []
     for tag in combined:
@@ -1,12 +1,15 @@
+import math
 import os
+import zipfile
 import pandas as pd
 import numpy as np
-from math import degrees, atan2, asin
 from datetime import datetime
+from functools import lru_cache
+from geopy.geocoders import Nominatim
 from timezonefinderL import TimezoneFinder
 import pytz
 from skyfield.api import load
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # ======================================================
 # COSTANTI ZODIACO / RULER / CASE
@@ -45,6 +48,11 @@ RULER_PER_SEGNO: Dict[str, str] = {
 
 CASE_ANGOLARI = {1, 4, 7, 10}
 
+# Obliquità media dell'eclittica (valore fisso J2000, radianti)
+OBLIQUITA_RAD = float(np.radians(23.4393))
+_SIN_EPS = math.sin(OBLIQUITA_RAD)
+_COS_EPS = math.cos(OBLIQUITA_RAD)
+
 # aspetti "standard" e orb per il NATALE (allineati a transiti.py)
 ASPECTS_DEG_NATAL: Dict[str, float] = {
     "congiunzione": 0.0,
@@ -68,6 +76,11 @@ ORB_MAX_NATAL: Dict[str, float] = {
 # ======================================================
 BASE_DIR = os.path.dirname(__file__)
 EFF_PATH = os.path.join(BASE_DIR, "effemeridi_1950_2025.xlsx")
+# accanto all'xlsx si tiene una copia .npz delle colonne già convertite:
+# evita di ri-parsare l'Excel (openpyxl, lento) a ogni avvio del worker.
+# Solo array numerici + nomi colonna, letti con allow_pickle=False: il file
+# non può eseguire codice e non dipende dalla versione di pandas.
+_EFF_CACHE_SUFFIX = ".npz"
 
 
 def _carica_effemeridi(path: str) -> pd.DataFrame | None:
@@ -77,15 +90,50 @@ def _carica_effemeridi(path: str) -> pd.DataFrame | None:
 
     Ritorna un DataFrame oppure None in caso di errore.
     """
+    cache = _leggi_cache_effemeridi(path)
+    if cache is not None:
+        return cache
     try:
-        df = pd.read_excel(path)
+        df = pd.read_excel(path, engine="openpyxl")
         # Conversione universale a numerico
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        return df
+        df = df.apply(pd.to_numeric, errors="coerce")
     except Exception as e:
         print(f"[ERRORE] Impossibile caricare effemeridi: {e}")
         return None
+    _scrivi_cache_effemeridi(df, path)
+    return df
+
+
+def _leggi_cache_effemeridi(path: str) -> pd.DataFrame | None:
+    """
+    Ritorna il DataFrame dalla cache su disco se è più recente dell'xlsx,
+    altrimenti None (cache assente, vecchia o illeggibile).
+    """
+    cache_path = path + _EFF_CACHE_SUFFIX
+    try:
+        if os.path.getmtime(cache_path) < os.path.getmtime(path):
+            return None
+    except OSError:
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as npz:
+            colonne = npz["colonne"].tolist()
+            return pd.DataFrame({c: npz[f"c{i}"] for i, c in enumerate(colonne)})
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        print(f"[AstroBot] Cache effemeridi ignorata ({cache_path}): {e}")
+        return None
+
+
+def _scrivi_cache_effemeridi(df: pd.DataFrame, path: str) -> None:
+    """Salva la cache (scrittura atomica); se la cartella non è scrivibile si prosegue senza."""
+    cache_path = path + _EFF_CACHE_SUFFIX
+    colonne = {f"c{i}": df[c].to_numpy() for i, c in enumerate(df.columns)}
+    try:
+        with open(cache_path + ".tmp", "wb") as f:
+            np.savez(f, colonne=np.array([str(c) for c in df.columns]), **colonne)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError as e:
+        print(f"[AstroBot] Cache effemeridi non salvata: {e}")
 
 
 df_tutti = _carica_effemeridi(EFF_PATH)
@@ -95,9 +143,118 @@ else:
     print("[ERRORE] Nessun file di effemeridi valido trovato.")
 
 
+def _indicizza_effemeridi(df: pd.DataFrame | None) -> Dict[Tuple[int, int, int], int]:
+    """
+    Indice (anno, mese, giorno) -> posizione di riga, costruito una volta sola.
+    A parità di data vale la prima riga, come con il filtro booleano.
+    """
+    if df is None or df.empty:
+        return {}
+    indice: Dict[Tuple[int, int, int], int] = {}
+    chiavi = zip(df["Anno"].tolist(), df["Mese"].tolist(), df["Giorno"].astype(int).tolist())
+    for pos, chiave in enumerate(chiavi):
+        indice.setdefault(chiave, pos)
+    return indice
+
+
+_EPH_INDEX = _indicizza_effemeridi(df_tutti)
+
+# colonne che identificano la data: tutte le altre sono longitudini
+_COLONNE_DATA = {"Anno", "Mese", "Giorno"}
+_EPH_PLANET_COLS: List[str] = (
+    [c for c in df_tutti.columns if c not in _COLONNE_DATA] if df_tutti is not None else []
+)
+# solo le colonne-pianeta, come matrice float64 contigua: una riga si legge
+# con una slice, senza passare da pandas né da un indice di colonne.
+# Resta float64: in float32 cambierebbero gli arrotondamenti a 4 decimali.
+_EPH_VALUES: Optional[np.ndarray] = (
+    np.ascontiguousarray(df_tutti[_EPH_PLANET_COLS].to_numpy(dtype=np.float64))
+    if df_tutti is not None else None
+)
+
+
+def _posizione_giorno(df: pd.DataFrame, anno: int, mese: int, giorno: int) -> Optional[int]:
+    """Posizione della riga del giorno richiesto, oppure None se assente."""
+    if df is df_tutti:
+        return _EPH_INDEX.get((anno, mese, giorno))
+    mask = (df["Anno"] == anno) & (df["Mese"] == mese) & (df["Giorno"].astype(int) == giorno)
+    pos = np.flatnonzero(mask.to_numpy())
+    return int(pos[0]) if pos.size else None
+
+
+def _righe_pianeti(df: pd.DataFrame, p0: int, p1: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Colonne-pianeta numeriche e i loro valori grezzi nelle righe p0 e p1,
+    come due array float64 allineati alla lista dei nomi.
+    """
+    if df is df_tutti:
+        return _EPH_PLANET_COLS, _EPH_VALUES[p0], _EPH_VALUES[p1]
+
+    cols: List[str] = []
+    raw0: List[float] = []
+    raw1: List[float] = []
+    for col, v0_raw, v1_raw in zip(df.columns, df.iloc[p0].tolist(), df.iloc[p1].tolist()):
+        # colonne-data e valori non numerici: salto
+        if col in _COLONNE_DATA or not np.issubdtype(type(v0_raw), np.number):
+            continue
+        cols.append(col)
+        raw0.append(float(v0_raw))
+        raw1.append(float(v1_raw))
+    return cols, np.array(raw0, dtype=np.float64), np.array(raw1, dtype=np.float64)
+
+
 # ======================================================
 # GEOLOCALIZZAZIONE E FUSO
 # ======================================================
+# TimezoneFinder carica i suoi dati poligonali nel costruttore: una volta sola
+_TZ_FINDER = TimezoneFinder()
+# client Nominatim condiviso (la costruzione non fa rete: la richiesta parte in geocode)
+_GEOLOCATOR = Nominatim(user_agent="astrobot")
+
+# Fallback offline minimale
+_FALLBACK_COORDS: Dict[str, Tuple[float, float, str]] = {
+    "napoli": (40.8518, 14.2681, "Europe/Rome"),
+    "roma": (41.9028, 12.4964, "Europe/Rome"),
+    "milano": (45.4642, 9.19, "Europe/Rome"),
+    "torino": (45.0703, 7.6869, "Europe/Rome"),
+    "firenze": (43.7696, 11.2558, "Europe/Rome"),
+    "bologna": (44.4949, 11.3426, "Europe/Rome"),
+    "palermo": (38.1157, 13.3615, "Europe/Rome"),
+    "genova": (44.4056, 8.9463, "Europe/Rome"),
+    "bari": (41.1253, 16.8660, "Europe/Rome"),
+    "cagliari": (39.2238, 9.1217, "Europe/Rome"),
+}
+
+
+@lru_cache(maxsize=1024)
+def _geocodifica_online(citta: str) -> Tuple[float, float, str]:
+    """
+    (lat, lon, timezone) di una città via Nominatim + TimezoneFinder.
+
+    Memoizzato per città: il fuso dipende dalla data (ora legale) e viene
+    calcolato fuori dalla cache. Gli errori (città non trovata, rete) non
+    vengono messi in cache, quindi la richiesta successiva riprova online.
+    """
+    loc = _GEOLOCATOR.geocode(citta, timeout=10)
+    if not loc:
+        raise ValueError("Città non trovata online.")
+
+    # Ricava timezone con TimezoneFinder (istanza unica di modulo)
+    timezone_str = _TZ_FINDER.timezone_at(lat=loc.latitude, lng=loc.longitude)
+    if not timezone_str:
+        timezone_str = "UTC"
+
+    return loc.latitude, loc.longitude, timezone_str
+
+
+@lru_cache(maxsize=4096)
+def _fuso_orario(tz_name: str, anno: int, mese: int, giorno: int, ora: int, minuti: int) -> float:
+    """Offset UTC (ore) del fuso `tz_name` in quella data/ora locale, ora legale inclusa."""
+    tz = pytz.timezone(tz_name)
+    dt_local = tz.localize(datetime(anno, mese, giorno, ora, minuti))
+    return dt_local.utcoffset().total_seconds() / 3600.0
+
+
 def geocodifica_citta_con_fuso(
     citta: str,
     anno: int,
@@ -109,7 +266,8 @@ def geocodifica_citta_con_fuso(
     """
     Geocodifica ibrida:
 
-    1) Prova con Nominatim (geopy) per ottenere lat/lon
+    1) Prova con Nominatim (geopy) per ottenere lat/lon (in cache per nome
+       normalizzato: minuscolo, senza spazi ai lati)
     2) Se fallisce, usa un fallback offline con alcune città italiane
     3) Come ultima spiaggia, usa Roma
 
@@ -124,71 +282,36 @@ def geocodifica_citta_con_fuso(
     """
     citta_norm = citta.lower().strip()
 
-    # Fallback offline minimale
-    fallback_coords = {
-        "napoli": (40.8518, 14.2681, "Europe/Rome"),
-        "roma": (41.9028, 12.4964, "Europe/Rome"),
-        "milano": (45.4642, 9.19, "Europe/Rome"),
-        "torino": (45.0703, 7.6869, "Europe/Rome"),
-        "firenze": (43.7696, 11.2558, "Europe/Rome"),
-        "bologna": (44.4949, 11.3426, "Europe/Rome"),
-        "palermo": (38.1157, 13.3615, "Europe/Rome"),
-        "genova": (44.4056, 8.9463, "Europe/Rome"),
-        "bari": (41.1253, 16.8660, "Europe/Rome"),
-        "cagliari": (39.2238, 9.1217, "Europe/Rome"),
-    }
-
     try:
-        # 1) Tentativo online con Nominatim
-        from geopy.geocoders import Nominatim
-
-        geolocator = Nominatim(user_agent="astrobot")
-        loc = geolocator.geocode(citta, timeout=10)
-        if not loc:
-            raise ValueError("Città non trovata online.")
-
-        # 2) Ricava timezone con TimezoneFinder
-        tf = TimezoneFinder()
-        timezone_str = tf.timezone_at(lat=loc.latitude, lng=loc.longitude)
-        if not timezone_str:
-            timezone_str = "UTC"
-
-        tz = pytz.timezone(timezone_str)
-        dt_local = tz.localize(datetime(anno, mese, giorno, ora, minuti))
-        fuso_orario = dt_local.utcoffset().total_seconds() / 3600.0
-
+        # 1) Tentativo online con Nominatim (+ timezone); la chiave di cache
+        # è il nome normalizzato, così "Roma" e " roma" fanno una sola richiesta
+        lat, lon, timezone_str = _geocodifica_online(citta_norm)
         return {
-            "lat": loc.latitude,
-            "lon": loc.longitude,
+            "lat": lat,
+            "lon": lon,
             "timezone": timezone_str,
-            "fuso_orario": fuso_orario,
+            "fuso_orario": _fuso_orario(timezone_str, anno, mese, giorno, ora, minuti),
         }
 
     except Exception as e:
         # 3) Fallback offline
-        if citta_norm in fallback_coords:
-            lat, lon, tz_name = fallback_coords[citta_norm]
-            tz = pytz.timezone(tz_name)
-            dt_local = tz.localize(datetime(anno, mese, giorno, ora, minuti))
-            fuso_orario = dt_local.utcoffset().total_seconds() / 3600.0
+        if citta_norm in _FALLBACK_COORDS:
+            lat, lon, tz_name = _FALLBACK_COORDS[citta_norm]
             return {
                 "lat": lat,
                 "lon": lon,
                 "timezone": tz_name,
-                "fuso_orario": fuso_orario,
+                "fuso_orario": _fuso_orario(tz_name, anno, mese, giorno, ora, minuti),
                 "note": f"Fallback offline ({e})",
             }
         else:
             # Ultima spiaggia: Roma
             tz_name = "Europe/Rome"
-            tz = pytz.timezone(tz_name)
-            dt_local = tz.localize(datetime(anno, mese, giorno, ora, minuti))
-            fuso_orario = dt_local.utcoffset().total_seconds() / 3600.0
             return {
                 "lat": 41.9,
                 "lon": 12.5,
                 "timezone": tz_name,
-                "fuso_orario": fuso_orario,
+                "fuso_orario": _fuso_orario(tz_name, anno, mese, giorno, ora, minuti),
                 "note": f"Fallback generico: {e}",
             }
 
@@ -196,6 +319,25 @@ def geocodifica_citta_con_fuso(
 # ======================================================
 # CALCOLO ASCENDENTE E CASE
 # ======================================================
+# timescale di Skyfield (tabelle delta-T / leap second) caricata una volta sola
+_TIMESCALE = load.timescale()
+
+
+def _asc_mc_rad(lst: float, phi: float) -> Tuple[float, float]:
+    """
+    ASC e MC (radianti) da tempo siderale locale e latitudine, con l'obliquità
+    media OBLIQUITA_RAD. Solo funzioni di `math`: su singoli float evita il
+    dispatch di numpy.
+
+    ASC in forma chiusa: punto dell'eclittica che sorge all'orizzonte est
+    (tan ASC = cos RAMC / -(sin RAMC cos eps + tan phi sin eps), con RAMC = LST).
+    """
+    sin_lst, cos_lst = math.sin(lst), math.cos(lst)
+    asc = math.atan2(cos_lst, -(sin_lst * _COS_EPS + math.tan(phi) * _SIN_EPS))
+    mc = math.atan2(sin_lst, cos_lst * _COS_EPS)
+    return asc, mc
+
+
 def calcola_asc_mc_case(
     citta: str,
     anno: int,
@@ -225,104 +367,96 @@ def calcola_asc_mc_case(
     info = geocodifica_citta_con_fuso(citta, anno, mese, giorno, ora, minuti)
     lat, lon, fuso = info["lat"], info["lon"], info["fuso_orario"]
 
+    (asc, segno_nome, gradi_segno, mc, segno_mc, gradi_mc,
+     case, sistema_case_out) = _asc_mc_case_da_coordinate(
+        lat, lon, fuso, anno, mese, giorno, ora, minuti, sistema_case
+    )
+
+    return {
+        "citta": citta,
+        "lat": round(lat, 4),
+        "lon": round(lon, 4),
+        "timezone": info["timezone"],
+        "fuso_orario": round(fuso, 2),
+        "ASC": asc,
+        "ASC_segno": segno_nome,
+        "ASC_gradi_segno": gradi_segno,
+        "MC": mc,
+        "MC_segno": segno_mc,
+        "MC_gradi_segno": gradi_mc,
+        "case": list(case),
+        "sistema_case": sistema_case_out,
+    }
+
+
+@lru_cache(maxsize=2048)
+def _asc_mc_case_da_coordinate(
+    lat: float,
+    lon: float,
+    fuso: float,
+    anno: int,
+    mese: int,
+    giorno: int,
+    ora: int,
+    minuti: int,
+    sistema_case: str,
+) -> tuple:
+    """
+    Parte astronomica di calcola_asc_mc_case, memoizzata.
+
+    La chiave sono le coordinate già risolte e non la città: così un fallback
+    di geocodifica (errore di rete) non resta bloccato in cache.
+    """
     # Skyfield – tempo in UTC
-    ts = load.timescale()
-    t = ts.utc(anno, mese, giorno, ora - fuso, minuti)
-
-    # Obliquità media
-    eps = np.radians(23.4393)
-    phi = np.radians(lat)
-    lst_hours = (t.gmst + lon / 15.0) % 24
-    LST = np.radians(lst_hours * 15)
-
-    def ra_dec_from_lambda(lmbda: float) -> tuple[float, float]:
-        sL, cL = np.sin(lmbda), np.cos(lmbda)
-        sin_eps, cos_eps = np.sin(eps), np.cos(eps)
-        alpha = atan2(sL * cos_eps, cL)
-        delta = asin(sL * sin_eps)
-        return alpha % (2 * np.pi), delta
-
-    def altitude(lambda_rad: float) -> float:
-        alpha, delta = ra_dec_from_lambda(lambda_rad)
-        H = (LST - alpha + 2 * np.pi) % (2 * np.pi)
-        return np.arcsin(
-            np.sin(phi) * np.sin(delta) + np.cos(phi) * np.cos(delta) * np.cos(H)
-        )
+    t = _TIMESCALE.utc(anno, mese, giorno, ora - fuso, minuti)
 
-    def azimuth(lambda_rad: float) -> tuple[float, float]:
-        alpha, delta = ra_dec_from_lambda(lambda_rad)
-        H = (LST - alpha + 2 * np.pi) % (2 * np.pi)
-        h = altitude(lambda_rad)
-        num = -np.sin(H)
-        den = (np.tan(delta) * np.cos(phi) - np.sin(phi) * np.cos(H))
-        return np.arctan2(num, den) % (2 * np.pi), h
-
-    # Ricerca numerica dell'Ascendente: alt ~ 0, az ~ 90°
-    lambdas = np.linspace(0, 2 * np.pi, 721)
-    best_lambda, best_score = None, 1e9
-    for lam in lambdas:
-        A, h = azimuth(lam)
-        score = abs(h) + 0.5 * abs((A - np.pi / 2 + np.pi) % (2 * np.pi) - np.pi)
-        if score < best_score:
-            best_score, best_lambda = score, lam
-
-    asc_deg = (degrees(best_lambda) % 360.0)
-
-    def _indice_segno(nome_segno: str) -> int:
-        try:
-            return SEGNI_ZODIACALI.index(nome_segno)
-        except ValueError:
-            raise ValueError(f"Segno non riconosciuto: {nome_segno}")
+    lst_hours = (float(t.gmst) + lon / 15.0) % 24
+    asc_rad, mc_rad = _asc_mc_rad(math.radians(lst_hours * 15), math.radians(lat))
+    asc_deg = math.degrees(asc_rad) % 360.0
 
     segno_idx = int(asc_deg // 30)
     segno_nome = SEGNI_ZODIACALI[segno_idx]
     gradi_segno = round(asc_deg % 30, 2)
 
     # MC approssimato
-    y_mc = np.sin(LST)
-    x_mc = np.cos(LST) * np.cos(eps)
-    mc_deg = np.degrees(np.arctan2(y_mc, x_mc)) % 360
+    mc_deg = math.degrees(mc_rad) % 360.0
     segno_idx_mc = int(mc_deg // 30)
     segno_mc = SEGNI_ZODIACALI[segno_idx_mc]
     gradi_mc = round(mc_deg % 30, 2)
 
     # ---------------- CASE ----------------
-    sistema_case_out = sistema_case
-    case: list[float] = []
-
     if sistema_case == "equal":
         # Case uguali: ogni 30° a partire dall'ASC
-        case = [(asc_deg + i * 30.0) % 360.0 for i in range(12)]
+        case = _cuspidi_equal(asc_deg)
         sistema_case_out = "equal"
 
     elif sistema_case == "whole_sign":
         # Whole Sign: casa I = 0° del segno dell'ASC
-        idx_segno_asc = _indice_segno(segno_nome)
-        for i in range(12):
-            deg = ((idx_segno_asc + i) % 12) * 30.0
-            case.append(deg)
+        case = _CUSPIDI_WHOLE_SIGN[segno_idx]
         sistema_case_out = "whole_sign"
 
     else:
         # Fallback robusto: calcolo equal ma lo segnalo
-        case = [(asc_deg + i * 30.0) % 360.0 for i in range(12)]
+        case = _cuspidi_equal(asc_deg)
         sistema_case_out = f"fallback_equal_{sistema_case}"
 
-    return {
-        "citta": citta,
-        "lat": round(lat, 4),
-        "lon": round(lon, 4),
-        "timezone": info["timezone"],
-        "fuso_orario": round(fuso, 2),
-        "ASC": round(asc_deg, 2),
-        "ASC_segno": segno_nome,
-        "ASC_gradi_segno": gradi_segno,
-        "MC": round(mc_deg, 2),
-        "MC_segno": segno_mc,
-        "MC_gradi_segno": gradi_mc,
-        "case": [round(c, 2) for c in case],
-        "sistema_case": sistema_case_out,
-    }
+    return (
+        round(asc_deg, 2), segno_nome, gradi_segno,
+        round(mc_deg, 2), segno_mc, gradi_mc,
+        case, sistema_case_out,
+    )
+
+
+_OFFSET_CASE = tuple(i * 30.0 for i in range(12))
+# whole sign: le cuspidi dipendono solo dal segno dell'ASC
+_CUSPIDI_WHOLE_SIGN = tuple(
+    tuple(((s + i) % 12) * 30.0 for i in range(12)) for s in range(12)
+)
+
+
+def _cuspidi_equal(asc_deg: float) -> Tuple[float, ...]:
+    """12 cuspidi equal già arrotondate, in un solo passaggio."""
+    return tuple([round((asc_deg + off) % 360.0, 2) for off in _OFFSET_CASE])
 
 
 # ======================================================
@@ -346,53 +480,51 @@ def calcola_pianeti_da_df(
     if df is None or df.empty:
         raise ValueError("Effemeridi non caricate correttamente.")
 
-    giorno_int = int(giorno)
+    if df is df_tutti:
+        cols, gradi, retro = _pianeti_effemeridi_globali(giorno, mese, anno, ora, minuti)
+    else:
+        cols, gradi, retro = _interpola_pianeti(df, giorno, mese, anno, ora, minuti)
 
-    r0 = df[
-        (df["Anno"] == anno)
-        & (df["Mese"] == mese)
-        & (df["Giorno"].astype(int) == giorno_int)
-    ]
-    r1 = df[
-        (df["Anno"] == anno)
-        & (df["Mese"] == mese)
-        & (df["Giorno"].astype(int) == giorno_int + 1)
-    ]
+    return {
+        col: {"gradi_eclittici": g, "retrogrado": r}
+        for col, g, r in zip(cols, gradi, retro)
+    }
 
-    if r0.empty:
-        raise ValueError(f"Nessuna effemeride trovata per {giorno}/{mese}/{anno}")
-    if r1.empty:
-        # ultimo giorno disponibile: niente interpolazione sul giorno dopo
-        r1 = r0.copy()
 
-    f0, f1 = r0.iloc[0], r1.iloc[0]
-    frac = (ora + minuti / 60.0) / 24.0
+@lru_cache(maxsize=2048)
+def _pianeti_effemeridi_globali(giorno, mese, anno, ora, minuti) -> tuple:
+    """Interpolazione su df_tutti memoizzata (stesso istante -> stessi valori)."""
+    return _interpola_pianeti(df_tutti, giorno, mese, anno, ora, minuti)
 
-    skip_cols = {"Anno", "Mese", "Giorno"}
-    planet_cols = [c for c in df.columns if c not in skip_cols]
 
-    pianeti: dict = {}
-    for col in planet_cols:
-        v0_raw = f0[col]
-        v1_raw = f1[col]
+def _interpola_pianeti(df: pd.DataFrame, giorno, mese, anno, ora, minuti) -> tuple:
+    """(colonne, gradi arrotondati, flag retrogrado) come tuple immutabili."""
+    giorno_int = int(giorno)
 
-        # se non sono numerici, salto
-        if not np.issubdtype(type(v0_raw), np.number):
-            continue
+    p0 = _posizione_giorno(df, anno, mese, giorno_int)
+    p1 = _posizione_giorno(df, anno, mese, giorno_int + 1)
 
-        raw0 = float(v0_raw)
-        raw1 = float(v1_raw)
+    if p0 is None:
+        raise ValueError(f"Nessuna effemeride trovata per {giorno}/{mese}/{anno}")
+    if p1 is None:
+        # ultimo giorno disponibile: niente interpolazione sul giorno dopo
+        p1 = p0
 
-        retrogrado = raw0 < 0
-        v0, v1 = abs(raw0) % 360.0, abs(raw1) % 360.0
-        v_interp = (v0 + (v1 - v0) * frac) % 360.0
+    frac = (ora + minuti / 60.0) / 24.0
 
-        pianeti[col] = {
-            "gradi_eclittici": round(v_interp, 4),
-            "retrogrado": retrogrado,
-        }
+    cols, raw0, raw1 = _righe_pianeti(df, p0, p1)
 
-    return pianeti
+    # interpolazione su tutte le colonne in un colpo (segno negativo = retrogrado)
+    retrogrado = raw0 < 0
+    v0 = np.abs(raw0) % 360.0
+    v1 = np.abs(raw1) % 360.0
+    v_interp = (v0 + (v1 - v0) * frac) % 360.0
+
+    return (
+        tuple(cols),
+        tuple([round(g, 4) for g in v_interp.tolist()]),
+        tuple(retrogrado.tolist()),
+    )
 
 
 # ======================================================
@@ -415,21 +547,6 @@ def decodifica_segni(pianeti_dict: dict) -> dict:
 
     Ignora sempre eventuali chiavi 'Data' / 'data' / 'DATE' ecc.
     """
-    segni = [
-        "Ariete",
-        "Toro",
-        "Gemelli",
-        "Cancro",
-        "Leone",
-        "Vergine",
-        "Bilancia",
-        "Scorpione",
-        "Sagittario",
-        "Capricorno",
-        "Acquario",
-        "Pesci",
-    ]
-
     out: dict = {}
     for nome, data in pianeti_dict.items():
         # 👇 filtro definitivo: niente chiavi 'data'
@@ -443,22 +560,19 @@ def decodifica_segni(pianeti_dict: dict) -> dict:
         if g is None:
             continue
 
-        retro = data.get("retrogrado", False)
-
-        try:
-            g_val = float(g)
-        except (TypeError, ValueError):
-            continue
-
-        idx = int(g_val // 30) % 12
-        segno = segni[idx]
-        gradi_segno = round(g_val % 30, 2)
+        if type(g) is float:
+            g_val = g
+        else:
+            try:
+                g_val = float(g)
+            except (TypeError, ValueError):
+                continue
 
         out[nome] = {
-            "segno": segno,
-            "gradi_segno": gradi_segno,
+            "segno": SEGNI_ZODIACALI[int(g_val // 30) % 12],
+            "gradi_segno": round(g_val % 30, 2),
             "gradi_eclittici": g_val,
-            "retrogrado": bool(retro),
+            "retrogrado": bool(data.get("retrogrado", False)),
         }
 
     return out
@@ -468,25 +582,20 @@ def decodifica_segni(pianeti_dict: dict) -> dict:
 # LOGICA NATALE: CASE, ASPETTI, TEMA COMPLETO
 # ======================================================
 
-def _min_delta_gradi(a: float, b: float) -> float:
-    """Distanza minima tra due gradi (0-360)."""
-    x = abs((a - b) % 360.0)
-    return x if x <= 180.0 else 360.0 - x
+# aspetti natali come array paralleli (ordine di ASPECTS_DEG_NATAL), per il
+# confronto vettoriale su tutte le coppie di pianeti
+_NATAL_ASPECT_NAMES: Tuple[str, ...] = tuple(ASPECTS_DEG_NATAL)
+_NATAL_ASPECT_DEG = np.array([ASPECTS_DEG_NATAL[n] for n in _NATAL_ASPECT_NAMES])
+_NATAL_ASPECT_ORB = np.array([ORB_MAX_NATAL.get(n, 0.0) for n in _NATAL_ASPECT_NAMES])
 
 
-def _match_aspect_natal(delta: float) -> Optional[tuple[str, float]]:
-    """
-    Trova se 'delta' (separazione angolare) corrisponde a un aspetto
-    entro l'orb massimo. Ritorna (tipo_aspetto, orb) oppure None.
-    """
-    best = None
-    best_orb = None
-    for nome, deg in ASPECTS_DEG_NATAL.items():
-        orb = abs(delta - deg)
-        if orb <= ORB_MAX_NATAL.get(nome, 0.0):
-            if best_orb is None or orb < best_orb:
-                best, best_orb = nome, orb
-    return (best, round(best_orb, 3)) if best is not None else None
+@lru_cache(maxsize=64)
+def _coppie_triangolari(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indici (i, j) con i < j per n elementi; array condivisi, in sola lettura."""
+    i, j = np.triu_indices(n, k=1)
+    i.flags.writeable = False
+    j.flags.writeable = False
+    return i, j
 
 
 def trova_casa_per_grado(grado: float, cuspidi_case: List[float]) -> int:
@@ -565,35 +674,38 @@ def calcola_aspetti_natal(
         "orb": float,     # scostamento dall'aspetto esatto
       }
     """
-    labels = []
-    for nome, data in pianeti.items():
-        if not isinstance(data, dict):
-            continue
-        if "gradi_eclittici" in data:
-            labels.append(nome)
-
-    out: List[Dict] = []
-    n = len(labels)
-    for i in range(n):
-        p1 = labels[i]
-        g1 = pianeti[p1]["gradi_eclittici"]
-        for j in range(i + 1, n):
-            p2 = labels[j]
-            g2 = pianeti[p2]["gradi_eclittici"]
-            delta = _min_delta_gradi(g1, g2)
-            m = _match_aspect_natal(delta)
-            if not m:
-                continue
-            tipo, orb = m
-            out.append(
-                {
-                    "pianeta1": p1,
-                    "pianeta2": p2,
-                    "tipo": tipo,
-                    "delta": round(delta, 3),
-                    "orb": round(orb, 3),
-                }
-            )
+    labels = [
+        nome
+        for nome, data in pianeti.items()
+        if isinstance(data, dict) and "gradi_eclittici" in data
+    ]
+    gradi = np.array([pianeti[p]["gradi_eclittici"] for p in labels], dtype=np.float64)
+
+    # tutte le coppie (i < j) in un colpo, nello stesso ordine del doppio ciclo
+    i, j = _coppie_triangolari(len(labels))
+    x = np.abs((gradi[i] - gradi[j]) % 360.0)
+    delta = np.where(x <= 180.0, x, 360.0 - x)
+
+    # matrice coppie x aspetti; a parità di orb vince il primo aspetto
+    orbs = np.abs(delta[:, None] - _NATAL_ASPECT_DEG)
+    orbs = np.where(orbs <= _NATAL_ASPECT_ORB, orbs, np.inf)
+    k = orbs.argmin(axis=1)
+    best = orbs[np.arange(k.size), k]
+    hit = np.isfinite(best)
+
+    out: List[Dict] = [
+        {
+            "pianeta1": labels[a],
+            "pianeta2": labels[b],
+            "tipo": _NATAL_ASPECT_NAMES[t],
+            "delta": round(d, 3),
+            "orb": round(o, 3),
+        }
+        for a, b, t, d, o in zip(
+            i[hit].tolist(), j[hit].tolist(), k[hit].tolist(),
+            delta[hit].tolist(), best[hit].tolist(),
+        )
+    ]
 
     out.sort(key=lambda a: (ASPECTS_DEG_NATAL[a["tipo"]], a["orb"], a["pianeta1"], a["pianeta2"]))
     return out
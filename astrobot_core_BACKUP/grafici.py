@@ -12,25 +12,41 @@ stringhe base64 (PNG) senza prefisso "data:image/png;base64,".
 from __future__ import annotations
 
 import base64
+import functools
+import hashlib
 import io
+import json
+import threading
 from datetime import datetime
 from math import isfinite
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import matplotlib
+
+# backend non interattivo per ambienti server/headless: va scelto prima
+# di importare pyplot (qui non serve, ma altri moduli lo importano)
+matplotlib.use("Agg")
+
 import matplotlib.dates as mdates
-import matplotlib.pyplot as plt
 import numpy as np
+from matplotlib.artist import setp
+from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
 
-# backend non interattivo per ambienti server/headless
-matplotlib.use("Agg")
+try:
+    import pybase64
+except ImportError:  # pybase64 è opzionale (encode SIMD); senza, base64 della stdlib
+    pybase64 = None
 
 
 # ---------------------------------------------------------------------------
 # Costanti di stile comuni
 # ---------------------------------------------------------------------------
 
+# Risoluzione dei PNG: 100 dpi bastano per la resa a schermo e riducono
+# di oltre la metà i pixel da rasterizzare e comprimere rispetto a 150
+DPI_GRAFICI = 100
+
 # Segni zodiacali (ordine Ariete -> Pesci)
 ZODIAC_GLYPHS: List[str] = [
     "♈", "♉", "♊", "♋",  # Ariete, Toro, Gemelli, Cancro
@@ -38,6 +54,15 @@ ZODIAC_GLYPHS: List[str] = [
     "♐", "♑", "♒", "♓",  # Sagittario, Capricorno, Acquario, Pesci
 ]
 
+# Longitudine d'inizio di ogni segno (per ASC/MC espressi come segno + gradi)
+_BASE_SEGNO: Dict[str, int] = {
+    nome: i * 30
+    for i, nome in enumerate([
+        "Ariete", "Toro", "Gemelli", "Cancro", "Leone", "Vergine",
+        "Bilancia", "Scorpione", "Sagittario", "Capricorno", "Acquario", "Pesci",
+    ])
+}
+
 # Glifi planetari (tema + sinastria)
 PLANET_GLYPHS: Dict[str, str] = {
     "Sole": "☉",
@@ -87,12 +112,81 @@ DEFAULT_LABEL_MAP_IT: Dict[str, str] = {
 # Helper generico
 # ---------------------------------------------------------------------------
 
-def _fig_to_base64(fig) -> str:
+# Le carte a ruota riusano Figure e Axes tra una richiesta e l'altra: creare
+# gli assi polari costa quanto una buona fetta del disegno. Le figure non
+# passano da pyplot (niente registro globale) e il lock serializza i render
+# che le condividono.
+_FIGURE_RIUSABILI: Dict[tuple, Tuple[Figure, tuple]] = {}
+_RENDER_LOCK = threading.Lock()
+
+
+# PNG già generati, per input identici (stesso contenuto e stesso ordine
+# delle chiavi: l'ordine decide legende e sovrapposizioni). FIFO con tetto:
+# una carta pesa 75-150 KB di PNG.
+_PNG_CACHE: Dict[str, bytes] = {}
+_PNG_CACHE_MAX = 64
+
+
+def _chiave_png(nome: str, args: tuple, kwargs: dict) -> Optional[str]:
+    try:
+        payload = json.dumps([nome, args, kwargs], default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _render_con_cache(func: Callable[..., bytes]) -> Callable[..., Union[str, bytes]]:
     """
-    Converte una figura matplotlib in PNG base64 (senza prefisso data URI).
+    Esegue la funzione di disegno (che produce i byte PNG) sotto _RENDER_LOCK;
+    se gli input sono identici a una chiamata recente riusa il PNG già pronto.
+
+    La funzione decorata restituisce base64 senza prefisso (str) come sempre;
+    con binario=True restituisce direttamente i byte PNG.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, binario: bool = False, **kwargs) -> Union[str, bytes]:
+        chiave = _chiave_png(func.__name__, args, kwargs)
+        png = _PNG_CACHE.get(chiave) if chiave is not None else None
+        if png is None:
+            with _RENDER_LOCK:
+                png = func(*args, **kwargs)
+                if chiave is not None:
+                    while len(_PNG_CACHE) >= _PNG_CACHE_MAX:
+                        del _PNG_CACHE[next(iter(_PNG_CACHE))]
+                    _PNG_CACHE[chiave] = png
+        return png if binario else _png_to_base64(png)
+
+    # wraps copia le annotazioni del corpo (-> bytes): qui vale quella del wrapper
+    wrapper.__annotations__ = {
+        **func.__annotations__, "binario": "bool", "return": "Union[str, bytes]"
+    }
+    return wrapper
+
+
+def _figura_riusabile(chiave: tuple, crea: Callable[[], Tuple[Figure, tuple]]) -> Tuple[Figure, tuple]:
+    """
+    Ritorna (fig, assi) per `chiave`, creandoli alla prima richiesta.
+    Alle chiamate successive gli assi vengono solo svuotati con cla().
+    Da usare sotto _RENDER_LOCK.
+    """
+    cached = _FIGURE_RIUSABILI.get(chiave)
+    if cached is None:
+        cached = crea()
+        _FIGURE_RIUSABILI[chiave] = cached
+    else:
+        for ax in cached[1]:
+            ax.cla()
+    return cached
+
+
+def _fig_to_png(fig: Figure) -> bytes:
+    """
+    Converte una figura matplotlib in byte PNG.
 
     - sfondo bianco (no trasparente)
     - assi con facecolor bianco
+
+    Le figure sono Figure dirette, fuori da pyplot: non c'è nulla da chiudere.
     """
     # Sfondo bianco per la figura
     fig.patch.set_facecolor("white")
@@ -108,9 +202,18 @@ def _fig_to_base64(fig) -> str:
         bbox_inches="tight",
         facecolor="white",  # niente transparent=True
     )
-    plt.close(fig)
-    buf.seek(0)
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
+    return buf.getvalue()
+
+
+def _png_to_base64(png: bytes) -> str:
+    """PNG base64 senza prefisso data URI."""
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(png)
+    return base64.b64encode(png).decode("ascii")
+
+
+def _fig_to_base64(fig: Figure) -> str:
+    return _png_to_base64(_fig_to_png(fig))
 
 
 # ---------------------------------------------------------------------------
@@ -160,7 +263,10 @@ def grafico_linee_premium(
                 f"({len(serie)}) diversa da numero date ({n_points})."
             )
 
-    fig, ax = plt.subplots(figsize=(7, 4), dpi=150)
+    # Figure diretta (non pyplot): nessun registro globale da aggiornare,
+    # la figura viene raccolta a fine funzione
+    fig = Figure(figsize=(7, 4), dpi=DPI_GRAFICI)
+    ax = fig.add_subplot()
 
     line_endpoints: Dict[str, float] = {}
     handles = []
@@ -199,7 +305,7 @@ def grafico_linee_premium(
     formatter = mdates.DateFormatter("%d/%m")
     ax.xaxis.set_major_locator(locator)
     ax.xaxis.set_major_formatter(formatter)
-    plt.setp(ax.get_xticklabels(), rotation=45, ha="right", fontsize=8)
+    setp(ax.get_xticklabels(), rotation=45, ha="right", fontsize=8)
 
     # Asse Y in percentuale 0–100%
     ax.set_ylim(0, 1.05)
@@ -540,15 +646,30 @@ def _disegna_aspetti_tema(
             )
 
 
+def _crea_figura_tema(figsize: Tuple[float, float]) -> Tuple[Figure, tuple]:
+    fig = Figure(figsize=figsize, dpi=DPI_GRAFICI)
+    gs = GridSpec(1, 3, width_ratios=[1.7, 1.1, 1.1], wspace=0.35)
+
+    ax = fig.add_subplot(gs[0, 0], projection="polar")  # ruota
+    ax_leg_plan = fig.add_subplot(gs[0, 1])             # legenda pianeti
+    ax_leg_aspe = fig.add_subplot(gs[0, 2])             # legenda aspetti
+    return fig, (ax, ax_leg_plan, ax_leg_aspe)
+
+
+@_render_con_cache
 def grafico_tema_natal(
     pianeti_decod: Dict[str, Dict[str, object]],
     asc_mc_case: Optional[Dict[str, object]] = None,
     aspetti: Optional[List[Dict[str, object]]] = None,
     figsize: Tuple[float, float] = (14, 7),
-) -> str:
+) -> bytes:
     """
     Genera la carta del Tema Natale (ruota + legende) e restituisce
-    una stringa PNG base64 (senza prefisso data URI).
+    una stringa PNG base64 (senza prefisso data URI); i byte PNG
+    con binario=True (vedi _render_con_cache).
+
+    Il corpo qui sotto restituisce i byte PNG: la conversione in base64
+    la fa _render_con_cache.
     """
     # Preparazione dati
     pianeti_natal = {k: v["gradi_eclittici"] for k, v in pianeti_decod.items()}
@@ -556,12 +677,9 @@ def grafico_tema_natal(
     aspect_rows = _build_aspect_legend_rows(aspetti)
 
     # Figura: polar + 2 legende
-    fig = plt.figure(figsize=figsize, dpi=150)
-    gs = GridSpec(1, 3, width_ratios=[1.7, 1.1, 1.1], wspace=0.35)
-
-    ax = fig.add_subplot(gs[0, 0], projection="polar")  # ruota
-    ax_leg_plan = fig.add_subplot(gs[0, 1])             # legenda pianeti
-    ax_leg_aspe = fig.add_subplot(gs[0, 2])             # legenda aspetti
+    fig, (ax, ax_leg_plan, ax_leg_aspe) = _figura_riusabile(
+        ("tema", tuple(figsize)), lambda: _crea_figura_tema(figsize)
+    )
 
     for axx in (ax_leg_plan, ax_leg_aspe):
         axx.axis("off")
@@ -598,13 +716,7 @@ def grafico_tema_natal(
 
     # ASC, MC, DS, IC
     if asc_mc_case:
-        segni_ordine = [
-            "Ariete", "Toro", "Gemelli", "Cancro", "Leone", "Vergine",
-            "Bilancia", "Scorpione", "Sagittario", "Capricorno", "Acquario", "Pesci",
-        ]
-        base_segno = {nome: i * 30 for i, nome in enumerate(segni_ordine)}
-
-        asc_deg = base_segno[asc_mc_case["ASC_segno"]] + asc_mc_case["ASC_gradi_segno"]
+        asc_deg = _BASE_SEGNO[asc_mc_case["ASC_segno"]] + asc_mc_case["ASC_gradi_segno"]
         asc_theta = np.deg2rad(asc_deg)
         ax.plot([asc_theta, asc_theta], [0, r_ruota], color="black", lw=2.4)
         ax.text(
@@ -617,7 +729,7 @@ def grafico_tema_natal(
             fontweight="bold",
         )
 
-        mc_deg = base_segno[asc_mc_case["MC_segno"]] + asc_mc_case["MC_gradi_segno"]
+        mc_deg = _BASE_SEGNO[asc_mc_case["MC_segno"]] + asc_mc_case["MC_gradi_segno"]
         mc_theta = np.deg2rad(mc_deg)
         ax.plot([mc_theta, mc_theta], [0, r_ruota], color="black", lw=2.4)
         ax.text(
@@ -749,7 +861,7 @@ def grafico_tema_natal(
             )
 
     fig.tight_layout()
-    return _fig_to_base64(fig)
+    return _fig_to_png(fig)
 
 
 # Alias per compatibilità con il notebook originale
@@ -899,9 +1011,7 @@ def _build_sinastria_legend_rows(
 
     all_names = [
         name for name in SINASTRIA_PLANET_ORDER if name in union
-    ] + [
-        name for name in sorted(union) if name not in SINASTRIA_PLANET_ORDER
-    ]
+    ] + sorted(union.difference(SINASTRIA_PLANET_ORDER))
 
     for name in all_names:
         dataA = pianeti_A_decod.get(name)
@@ -987,6 +1097,16 @@ def _build_sinastria_aspect_lists(
     return positivi, negativi
 
 
+def _crea_figura_sinastria(figsize: Tuple[float, float]) -> Tuple[Figure, tuple]:
+    fig = Figure(figsize=figsize, dpi=DPI_GRAFICI)
+    gs = GridSpec(1, 2, width_ratios=[1.6, 1.4], wspace=0.30)
+
+    ax = fig.add_subplot(gs[0, 0], projection="polar")  # ruota sinastria
+    ax_leg = fig.add_subplot(gs[0, 1])                  # pannello legende
+    return fig, (ax, ax_leg)
+
+
+@_render_con_cache
 def grafico_sinastria(
     pianeti_A_decod: Dict[str, Dict[str, object]],
     pianeti_B_decod: Dict[str, Dict[str, object]],
@@ -994,9 +1114,13 @@ def grafico_sinastria(
     nome_A: str = "A",
     nome_B: str = "B",
     figsize: Tuple[float, float] = (12, 7),
-) -> str:
+) -> bytes:
     """
-    Grafico sinastria completo (ruota + pannello destro).
+    Grafico sinastria completo (ruota + pannello destro): PNG base64,
+    oppure byte PNG con binario=True.
+
+    Il corpo qui sotto restituisce i byte PNG: la conversione in base64
+    la fa _render_con_cache.
     """
     pianeti_A_long = {k: v["gradi_eclittici"] for k, v in pianeti_A_decod.items()}
     pianeti_B_long = {k: v["gradi_eclittici"] for k, v in pianeti_B_decod.items()}
@@ -1004,11 +1128,9 @@ def grafico_sinastria(
     legend_rows = _build_sinastria_legend_rows(pianeti_A_decod, pianeti_B_decod)
     aspetti_pos, aspetti_neg = _build_sinastria_aspect_lists(aspetti_AB or [])
 
-    fig = plt.figure(figsize=figsize, dpi=150)
-    gs = GridSpec(1, 2, width_ratios=[1.6, 1.4], wspace=0.30)
-
-    ax = fig.add_subplot(gs[0, 0], projection="polar")  # ruota sinastria
-    ax_leg = fig.add_subplot(gs[0, 1])                  # pannello legende
+    fig, (ax, ax_leg) = _figura_riusabile(
+        ("sinastria", tuple(figsize)), lambda: _crea_figura_sinastria(figsize)
+    )
     ax_leg.axis("off")
 
     ax.set_theta_zero_location("N")
@@ -1166,7 +1288,7 @@ def grafico_sinastria(
             y -= 0.032
 
     fig.tight_layout()
-    return _fig_to_base64(fig)
+    return _fig_to_png(fig)
 
 
 def genera_carta_sinastria(
@@ -4,40 +4,51 @@ from groq import Groq
 
 DEFAULT_MODEL = "llama-3.3-70b-versatile"
 
+# client Groq condiviso: creato alla prima chiamata e poi riusato (pool HTTP/TLS)
+_GROQ: Optional[Groq] = None
+
+_SYSTEM_PROMPT = "Sei un astrologo esperto e scrivi in italiano fluente e preciso."
+_INTRO_PROMPT = (
+    "Sei un astrologo professionista. Fornisci un’interpretazione sintetica, empatica e chiara "
+    "del seguente tema natale.\n\n"
+)
+
 
 def build_prompt(asc, pianeti, meta, domanda_utente=None):
     """Crea prompt completo per l’interpretazione astrologica."""
-    asc_info = (
-        f"Ascendente in {asc.get('ASC_segno')} a {asc.get('ASC_gradi_segno')}°.\n"
-        f"Medio Cielo in {asc.get('MC_segno')} a {asc.get('MC_gradi_segno')}°.\n"
-    )
-
-    pianeti_info = "\n".join([
-        f"- {nome} in {d['segno']} a {d['gradi_segno']}°{' (R)' if d['retrogrado'] else ''}"
-        for nome, d in pianeti.items()
-        if nome not in ("Nodo", "Lilith")
-    ])
-
-    base_prompt = (
-        "Sei un astrologo professionista. Fornisci un’interpretazione sintetica, empatica e chiara "
-        "del seguente tema natale.\n\n"
-        f"Città: {meta.get('citta')}\nData e ora: {meta.get('data')} {meta.get('ora')}\n\n"
-        f"{asc_info}\nPianeti:\n{pianeti_info}\n\n"
-    )
-
+    # pezzi raccolti in una lista e uniti una volta sola alla fine
+    parts = [
+        _INTRO_PROMPT,
+        f"Città: {meta.get('citta')}\nData e ora: {meta.get('data')} {meta.get('ora')}\n\n",
+        f"Ascendente in {asc.get('ASC_segno')} a {asc.get('ASC_gradi_segno')}°.\n",
+        f"Medio Cielo in {asc.get('MC_segno')} a {asc.get('MC_gradi_segno')}°.\n",
+        "\nPianeti:\n",
+        "\n".join([
+            f"- {nome} in {d['segno']} a {d['gradi_segno']}°{' (R)' if d['retrogrado'] else ''}"
+            for nome, d in pianeti.items()
+            if nome not in ("Nodo", "Lilith")
+        ]),
+        "\n\n",
+    ]
     if domanda_utente:
-        base_prompt += f"Domanda specifica: {domanda_utente}\n"
+        parts.append(f"Domanda specifica: {domanda_utente}\n")
 
     return [
-        {"role": "system", "content": "Sei un astrologo esperto e scrivi in italiano fluente e preciso."},
-        {"role": "user", "content": base_prompt}
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": "".join(parts)}
     ]
 
 
+def _groq_client() -> Groq:
+    global _GROQ
+    if _GROQ is None:
+        _GROQ = Groq(api_key=os.environ.get("GROQ_API_KEY"))
+    return _GROQ
+
+
 def call_ai_model(messages, model=DEFAULT_MODEL, temperature=0.6, max_tokens=700):
     try:
-        client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-        chat = client.chat.completions.create(
+        chat = _groq_client().chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
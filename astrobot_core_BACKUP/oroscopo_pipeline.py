@@ -2,6 +2,7 @@ from __future__ import annotations
 import math
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, date
+from operator import attrgetter, itemgetter
 from typing import Any, Dict, List, Optional
 
 from .oroscopo_sampling import (
@@ -13,6 +14,7 @@ from .oroscopo_sampling import (
 from .transiti import (
     prepara_tema_natale,
     transiti_vs_tema_precalc,
+    transiti_vs_tema_batch,
     ORB_MAX,
 )
 from .calcoli import costruisci_tema_natale
@@ -398,7 +400,7 @@ def aggrega_aspetti_rilevanti(
 
     ordinati = sorted(
         aggregati.values(),
-        key=lambda a: a.score_rilevanza,
+        key=attrgetter("score_rilevanza"),
         reverse=True,
     )
     return ordinati[:max_aspetti]
@@ -550,7 +552,7 @@ def _calcola_pianeti_prevalenti(
         )
 
     # ordiniamo per score_periodo decrescente
-    out.sort(key=lambda x: x["score_periodo"], reverse=True)
+    out.sort(key=itemgetter("score_periodo"), reverse=True)
 
     return out[:max_pianeti]
 
@@ -733,25 +735,38 @@ def run_oroscopo_multi_snapshot(
     # 4) mapping Periodo -> use_case (daily/weekly/monthly/yearly)
     use_case = _map_periodo_to_use_case(periodo)
 
-    # 5) loop sugli snapshot
-    samples: List[SnapshotResult] = []
-    for snap in snapshots_info:
-        label = snap["label"]
-        dt_iso = snap["datetime"]
-        dt = datetime.fromisoformat(dt_iso)
-
-        usa_api_transiti = str(periodo) == "giornaliero"
-
-        transiti_data = transiti_vs_tema_precalc(
+    # 5) transiti per tutti gli snapshot: API per il giornaliero,
+    #    altrimenti DF in un unico passaggio vettoriale
+    snapshot_dts = [datetime.fromisoformat(snap["datetime"]) for snap in snapshots_info]
+    if str(periodo) == "giornaliero":
+        transiti_per_snapshot = [
+            transiti_vs_tema_precalc(
+                tema_ctx=tema_ctx,
+                quando=dt,
+                include_node=include_node,
+                include_lilith=include_lilith,
+                filtra_transito=filtra_transito,
+                filtra_natal=filtra_natal,
+                usa_api_transiti=True,
+            )
+            for dt in snapshot_dts
+        ]
+    else:
+        transiti_per_snapshot = transiti_vs_tema_batch(
             tema_ctx=tema_ctx,
-            quando=dt,
+            whens=snapshot_dts,
             include_node=include_node,
             include_lilith=include_lilith,
             filtra_transito=filtra_transito,
             filtra_natal=filtra_natal,
-            usa_api_transiti=usa_api_transiti,
         )
 
+    # 5b) loop sugli snapshot
+    samples: List[SnapshotResult] = []
+    for snap, dt, transiti_data in zip(snapshots_info, snapshot_dts, transiti_per_snapshot):
+        label = snap["label"]
+        dt_iso = snap["datetime"]
+
         aspetti_list = transiti_data.get("aspetti", [])
 
         # DEBUG ANNUALE: transiti grezzi su alcuni snapshot chiave
@@ -3,7 +3,9 @@
 from __future__ import annotations
 from typing import List, Dict, Any
 import io, base64
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use("Agg")  # headless: prima di importare pyplot
+from matplotlib.figure import Figure
 
 def moving_average(values: List[float], window: int) -> List[float]:
     if window <= 1 or window > len(values):
@@ -28,9 +30,11 @@ def trend_bar_png(scores: List[float], labels: List[str], grafica_cfg: Dict[str,
         window = int(smoothing.get("window", 3))
         data = moving_average(data, window)
 
-    fig, ax = plt.subplots(figsize=(export_cfg.get("size_px", {}).get("width", 1200)/100,
-                                    export_cfg.get("size_px", {}).get("height", 1200)/100),
-                           dpi=export_cfg.get("dpi", 144))
+    # Figure senza pyplot: niente stato globale, niente plt.close
+    fig = Figure(figsize=(export_cfg.get("size_px", {}).get("width", 1200)/100,
+                          export_cfg.get("size_px", {}).get("height", 1200)/100),
+                 dpi=export_cfg.get("dpi", 144))
+    ax = fig.add_subplot()
 
     ax.bar(range(len(data)), data)  # no explicit colors per guidelines
     ax.set_xticks(range(len(labels)))
@@ -42,6 +46,5 @@ def trend_bar_png(scores: List[float], labels: List[str], grafica_cfg: Dict[str,
     fig.tight_layout()
     buf = io.BytesIO()
     fig.savefig(buf, format="png", bbox_inches="tight")
-    plt.close(fig)
     b64 = base64.b64encode(buf.getvalue()).decode("ascii")
     return "data:image/png;base64," + b64
@@ -1,6 +1,10 @@
 from __future__ import annotations
+import inspect
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Any
+
+import numpy as np
 
 from .calcoli import (
     df_tutti,
@@ -8,7 +12,7 @@ from .calcoli import (
     calcola_asc_mc_case,
     decodifica_segni,
 )
-from .transiti_pesatura import calcola_score_definitivo_aspetto  # NEW: scoring transiti+natal
+from .transiti_pesatura import calcola_score_definitivo_batch  # NEW: scoring transiti+natal
 
 ASPECTS_DEG = {
     "congiunzione": 0,
@@ -39,6 +43,11 @@ PIANETI_BASE = [
     "Plutone",
 ]
 
+# layout fisso SoA: ogni array di longitudini è indicizzato da PLANET_INDEX
+PLANET_NAMES: Tuple[str, ...] = tuple(PIANETI_BASE) + ("Nodo", "Lilith", "Ascendente")
+PLANET_INDEX: Dict[str, int] = {n: i for i, n in enumerate(PLANET_NAMES)}
+N_PLANETS = len(PLANET_NAMES)
+
 SEGNI_IDX = {
     "Ariete": 0,
     "Toro": 1,
@@ -95,48 +104,120 @@ def _calcola_polarita_aspetto(transit_planet: str, aspect_type: str) -> float:
     return raw
 
 
-# ---------- util gradi/aspetti ------------------------------------------------
+# ---------- util gradi/aspetti (SoA) ------------------------------------------
+
+_ASPECT_NAMES: Tuple[str, ...] = tuple(ASPECTS_DEG)
+_ASPECT_ANGLES = np.array([ASPECTS_DEG[n] for n in _ASPECT_NAMES], dtype=np.float64)
+_ASPECT_ORBS = np.array([ORB_MAX.get(n, 0) for n in _ASPECT_NAMES], dtype=np.float64)
+
+
+class PlanetPositions(NamedTuple):
+    """
+    Posizioni planetarie in layout SoA: longs[i] / mask[i] si riferiscono
+    a PLANET_NAMES[i]. I pianeti assenti hanno longs = NaN e mask = False.
+    """
+
+    longs: np.ndarray
+    mask: np.ndarray
+
+
+def _to_positions(m: Dict[str, float]) -> PlanetPositions:
+    """
+    Converte {nome: gradi} nel layout SoA (le chiavi sconosciute sono ignorate).
+    m rispetta il contratto di _normalize_pianeti_from_raw (solo float).
+    """
+    longs = np.full(N_PLANETS, np.nan)
+    for nome, v in m.items():
+        i = PLANET_INDEX.get(nome)
+        if i is not None:
+            longs[i] = v
+    return PlanetPositions(longs, ~np.isnan(longs))
 
-def _min_delta(a: float, b: float) -> float:
-    x = abs((a - b) % 360.0)
-    return x if x <= 180 else 360.0 - x
 
+def _names_mask(nomi: List[str]) -> np.ndarray:
+    return np.array([n in nomi for n in PLANET_NAMES], dtype=bool)
 
-def _match_aspect(delta: float) -> Optional[Tuple[str, float]]:
-    best = None
-    best_orb = None
-    for nome, deg in ASPECTS_DEG.items():
-        orb = abs(delta - deg)
-        if orb <= ORB_MAX.get(nome, 0):
-            if best_orb is None or orb < best_orb:
-                best, best_orb = nome, orb
-    return (best, round(best_orb, 3)) if best is not None else None
+
+def _min_delta_array(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distanza angolare minima in [0, 180] tra a e b (con broadcasting)."""
+    x = (a - b) % 360.0
+    return np.minimum(x, 360.0 - x)
+
+
+def _match_aspect_array(delta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per ogni delta restituisce (indice in _ASPECT_NAMES oppure -1, orb non
+    arrotondato), entro ORB_MAX. A parità di orb vince il primo aspetto.
+    """
+    orbs = np.abs(delta[..., None] - _ASPECT_ANGLES)
+    orbs = np.where(orbs <= _ASPECT_ORBS, orbs, np.inf)
+    k = orbs.argmin(axis=-1)
+    best = np.take_along_axis(orbs, k[..., None], axis=-1)[..., 0]
+    return np.where(np.isfinite(best), k, -1), best
 
 
 # ---------- coercion/normalize ------------------------------------------------
 
+# chiavi "gradi assoluti" in ordine di priorità (+ set per il test rapido)
+_DEG_KEYS: Tuple[str, ...] = (
+    "gradi_eclittici",
+    "gradi_assoluti",
+    "assoluti",
+    "long_abs",
+    "longitudine_assoluta",
+    "lambda",
+    "long",
+    "longitudine",
+    "deg",
+    "degrees",
+    "value",
+    "val",
+)
+_DEG_KEYS_SET = frozenset(_DEG_KEYS)
+
+_SEGNI_IDX_LOWER: Dict[str, int] = {k.lower(): v for k, v in SEGNI_IDX.items()}
+
+# chiavi candidate nei record {"nome": ..., <gradi>}: prima i gradi assoluti,
+# poi (se il primo gruppo non dà un valore utilizzabile) i gradi nel segno
+_DEG_CANDIDATE_KEYS: Tuple[Tuple[str, ...], ...] = (
+    ("val", "value", "deg", "long", "longitudine", "gradi_eclittici"),
+    ("gradi", "gradi_segno"),
+)
+
+
+def _deg_from_record(x: Dict) -> Optional[float]:
+    """
+    Un solo passaggio sulle chiavi candidate. Per ogni gruppo vale la semantica
+    di `x.get(k1) or x.get(k2) or ...`: primo valore truthy, altrimenti l'ultimo.
+    """
+    for gruppo in _DEG_CANDIDATE_KEYS:
+        v = None
+        for key in gruppo:
+            v = x.get(key)
+            if v:
+                break
+        deg = _coerce_deg(v)
+        if deg is not None:
+            return deg
+    return None
+
+
 def _coerce_deg(value: Any) -> Optional[float]:
-    if isinstance(value, (int, float)):
+    # fast path: il caso comune è un float "nudo"
+    t = type(value)
+    if t is float:
+        return value % 360.0
+    if t is int:
         return float(value) % 360.0
-    if isinstance(value, dict):
-        # gradi assoluti diretti
-        for k in (
-            "gradi_eclittici",
-            "gradi_assoluti",
-            "assoluti",
-            "long_abs",
-            "longitudine_assoluta",
-            "lambda",
-            "long",
-            "longitudine",
-            "deg",
-            "degrees",
-            "value",
-            "val",
-        ):
-            v = value.get(k)
-            if isinstance(v, (int, float)):
-                return float(v) % 360.0
+    if t is dict or isinstance(value, dict):
+        # gradi assoluti diretti (solo le chiavi effettivamente presenti)
+        hits = value.keys() & _DEG_KEYS_SET
+        if hits:
+            for k in _DEG_KEYS:
+                if k in hits:
+                    v = value[k]
+                    if isinstance(v, (int, float)):
+                        return float(v) % 360.0
         # (segno_idx, gradi_segno)
         seg_idx = value.get("segno_idx")
         gs = (
@@ -149,14 +230,23 @@ def _coerce_deg(value: Any) -> Optional[float]:
         # (segno, gradi_segno)
         seg = value.get("segno") or value.get("segno_nome")
         if isinstance(seg, str) and isinstance(gs, (int, float)):
-            idx = SEGNI_IDX.get(seg.strip().capitalize())
+            idx = _SEGNI_IDX_LOWER.get(seg.strip().lower())
             if idx is not None:
                 return (idx * 30.0 + float(gs)) % 360.0
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) % 360.0
     return None
 
 
 def _normalize_pianeti_from_raw(raw: Any) -> Dict[str, float]:
-    """Estrae {nome: gradi_assoluti} da molte forme comuni."""
+    """
+    Estrae {nome: gradi_assoluti} da molte forme comuni.
+
+    È il confine con i dati grezzi: il risultato contiene solo float finiti
+    (niente None/str/NaN, i pianeti non disponibili sono chiavi assenti).
+    A valle di qui le mappe di longitudini non vengono più ricontrollate.
+    """
     data = raw
     # lista di record?
     if isinstance(data, (list, tuple)) and data:
@@ -164,21 +254,10 @@ def _normalize_pianeti_from_raw(raw: Any) -> Dict[str, float]:
             if all(isinstance(x, dict) and "nome" in x for x in data):
                 tmp: Dict[str, float] = {}
                 for x in data:
-                    deg = _coerce_deg(
-                        x.get("val")
-                        or x.get("value")
-                        or x.get("deg")
-                        or x.get("long")
-                        or x.get("longitudine")
-                        or x.get("gradi_eclittici")
-                    )
-                    if deg is None:
-                        deg = _coerce_deg(
-                            x.get("gradi") or x.get("gradi_segno")
-                        )
+                    deg = _deg_from_record(x)
                     nome = x.get("nome") or x.get("planet") or x.get("pianeta")
-                    if nome and isinstance(deg, (int, float)):
-                        tmp[str(nome)] = float(deg)
+                    if nome and deg is not None and deg == deg:
+                        tmp[str(nome)] = deg
                 return tmp
             data = data[0]
 
@@ -194,25 +273,76 @@ def _normalize_pianeti_from_raw(raw: Any) -> Dict[str, float]:
             if isinstance(k, str) and k.lower() == "data":
                 continue
             deg = _coerce_deg(v)
-            if isinstance(deg, (int, float)):
-                out[k] = float(deg)
+            if deg is not None and deg == deg:  # float, NaN scartato
+                out[k] = deg
     return out
 
 
+def _parse_data_ora(data: str, ora: str) -> datetime:
+    """
+    Equivale a strptime(f"{data} {ora}", "%Y-%m-%d %H:%M"), con fast path
+    fromisoformat per il formato canonico "YYYY-MM-DD" + "HH:MM".
+    """
+    if (
+        type(data) is str
+        and type(ora) is str
+        and len(data) == 10
+        and len(ora) == 5
+        and data[4] == data[7] == "-"
+        and ora[2] == ":"
+        and (data[:4] + data[5:7] + data[8:] + ora[:2] + ora[3:]).isdigit()
+    ):
+        try:
+            return datetime.fromisoformat(f"{data}T{ora}")
+        except ValueError:
+            pass  # es. mese 13: lascio a strptime il messaggio d'errore
+    return datetime.strptime(f"{data} {ora}", "%Y-%m-%d %H:%M")
+
+
+def _fmt_data_ora(dt: datetime) -> str:
+    """dt.strftime("%Y-%m-%d %H:%M") senza passare da time.strftime nel caso comune."""
+    if dt.tzinfo is None and dt.year >= 1000:
+        return dt.isoformat(sep=" ", timespec="minutes")
+    return dt.strftime("%Y-%m-%d %H:%M")
+
+
 def _estrai_ascendente(asc_res: Any) -> Optional[float]:
     if asc_res is None:
         return None
     if isinstance(asc_res, dict):
         v = asc_res.get("ASC", asc_res.get("Ascendente"))
-        if isinstance(v, (int, float)):
+        if isinstance(v, (int, float)) and v == v:
             return float(v) % 360.0
-    elif isinstance(asc_res, (int, float)):
+    elif isinstance(asc_res, (int, float)) and asc_res == asc_res:
         return float(asc_res) % 360.0
     return None
 
 
 # ---------- pianeti robusti: DF -----------------------------------------------
 
+# firma di calcola_pianeti_da_df risolta UNA volta all'import, invece di
+# provare più chiamate con try/except TypeError a ogni snapshot
+_SIG_PIANETI = inspect.signature(calcola_pianeti_da_df).parameters
+_HAS_ORA = "ora" in _SIG_PIANETI and "minuti" in _SIG_PIANETI
+_HAS_COLONNE_EXTRA = "colonne_extra" in _SIG_PIANETI
+
+
+def _build_call_pianeti_df() -> Callable[..., Any]:
+    """(giorno, mese, anno, ora, minuti, colonne_extra) -> raw del DF."""
+    if _HAS_ORA:
+        return lambda g, m, a, h, mi, extra: calcola_pianeti_da_df(
+            df_tutti, g, m, a, h, mi
+        )
+    if _HAS_COLONNE_EXTRA:
+        return lambda g, m, a, h, mi, extra: calcola_pianeti_da_df(
+            df_tutti, g, m, a, colonne_extra=extra
+        )
+    return lambda g, m, a, h, mi, extra: calcola_pianeti_da_df(df_tutti, g, m, a)
+
+
+_call_pianeti_df = _build_call_pianeti_df()
+
+
 def _safe_calcola_pianeti(
     giorno: int,
     mese: int,
@@ -227,50 +357,18 @@ def _safe_calcola_pianeti(
     in modo robusto. Questo è la base per TUTTI i casi non giornalieri
     (settimana/mese/anno) e come fallback quando l'API non è disponibile.
     """
-    raw = None
-
-    # 1) tentativi classici
-    tries = [
-        lambda: calcola_pianeti_da_df(
-            df_tutti, giorno, mese, anno, ora, minuti
-        ),
-        lambda: calcola_pianeti_da_df(df_tutti, giorno, mese, anno),
-        lambda: calcola_pianeti_da_df(
-            df_tutti,
-            giorno,
-            mese,
-            anno,
-            ora,
-            minuti,
-            (
-                "Nodo" if include_node else None,
-                "Lilith" if include_lilith else None,
-            ),
-        ),
-        lambda: calcola_pianeti_da_df(
-            df_tutti,
-            giorno,
-            mese,
-            anno,
-            colonne_extra=tuple(
-                [
-                    x
-                    for x in ("Nodo", "Lilith")
-                    if (x == "Nodo" and include_node)
-                    or (x == "Lilith" and include_lilith)
-                ]
-            ),
-        ),
-    ]
-    for t in tries:
-        try:
-            raw = t()
-            if raw is not None:
-                break
-        except TypeError:
-            continue
-        except Exception:
-            continue
+    # 1) chiamata con la firma rilevata all'import
+    colonne_extra = tuple(
+        x
+        for x, on in (("Nodo", include_node), ("Lilith", include_lilith))
+        if on
+    )
+    try:
+        raw = _call_pianeti_df(giorno, mese, anno, ora, minuti, colonne_extra)
+    except Exception:
+        return {}
+    if raw is None:
+        return {}
 
     # 2) normalizzazione diretta
     m = _normalize_pianeti_from_raw(raw)
@@ -286,7 +384,9 @@ def _safe_calcola_pianeti(
                 if isinstance(k, str) and k.lower() == "data":
                     continue
                 if isinstance(v, dict) and "gradi_eclittici" in v:
-                    out[k] = float(v["gradi_eclittici"]) % 360.0
+                    g = float(v["gradi_eclittici"]) % 360.0
+                    if g == g:
+                        out[k] = g
             if out:
                 return out
     except Exception:
@@ -358,44 +458,54 @@ def _calcola_pianeti_api(
 
 # ---------- aspetti -----------------------------------------------------------
 
+def _to_decod_shape(long_map: Dict[str, float]) -> Dict[str, Dict]:
+    """{pianeta: gradi} -> shape atteso da decodifica_segni (NaN esclusi)."""
+    out: Dict[str, Dict] = {}
+    for k, v in long_map.items():
+        if v == v:
+            out[k] = {"gradi_eclittici": float(v), "retrogrado": False}
+    return out
+
+
+@lru_cache(maxsize=4096)
+def _decodifica_cached(items: Tuple[Tuple[str, float], ...]) -> Dict[str, Dict]:
+    return decodifica_segni(_to_decod_shape(dict(items)))
+
+
+def _decodifica_long(long_map: Dict[str, float]) -> Dict[str, Dict]:
+    """
+    decodifica_segni(_to_decod_shape(long_map)) memoizzato: i dati natali si
+    ripetono identici tra molte chiamate dello stesso utente.
+    """
+    items = tuple((k, float(v)) for k, v in long_map.items() if v == v)
+    return {k: dict(v) for k, v in _decodifica_cached(items).items()}
+
+
 def _calcola_aspetti(
     long_pianeti: Dict[str, float],
     include_node: bool = True,
     include_lilith: bool = True,
 ) -> List[Dict]:
-    labels: List[str] = []
-    for p in PIANETI_BASE:
-        if p in long_pianeti:
-            labels.append(p)
-    if include_node and "Nodo" in long_pianeti:
-        labels.append("Nodo")
-    if include_lilith and "Lilith" in long_pianeti:
-        labels.append("Lilith")
-    if "Ascendente" in long_pianeti:
-        labels.append("Ascendente")
+    pos = _to_positions(long_pianeti)
+    idx = np.flatnonzero(_labels_for(pos, include_node, include_lilith))
+
+    # tutte le coppie (i < j) nell'ordine di PLANET_NAMES
+    iu, ju = np.triu_indices(len(idx), k=1)
+    i, j = idx[iu], idx[ju]
+    k, orbs = _match_aspect_array(_min_delta_array(pos.longs[i], pos.longs[j]))
 
     out: List[Dict] = []
-    for i in range(len(labels)):
-        for j in range(i + 1, len(labels)):
-            p1, p2 = labels[i], labels[j]
-            v1, v2 = long_pianeti.get(p1), long_pianeti.get(p2)
-            if not isinstance(v1, (int, float)) or not isinstance(
-                v2, (int, float)
-            ):
-                continue
-            delta = _min_delta(v1, v2)
-            match = _match_aspect(delta)
-            if match:
-                tipo, orb = match
-                out.append(
-                    {
-                        "pianeta1": p1,
-                        "pianeta2": p2,
-                        "tipo": tipo,
-                        "delta": orb,
-                        "orb": orb,
-                    }
-                )
+    for src in np.flatnonzero(k >= 0).tolist():
+        orb = round(float(orbs[src]), 3)
+        out.append(
+            {
+                "pianeta1": PLANET_NAMES[i[src]],
+                "pianeta2": PLANET_NAMES[j[src]],
+                "tipo": _ASPECT_NAMES[k[src]],
+                "delta": orb,
+                "orb": orb,
+            }
+        )
     out.sort(key=lambda x: (ASPECTS_DEG[x["tipo"]], x["orb"]))
     return out
 
@@ -427,7 +537,7 @@ def calcola_transiti_data_fissa(
                 citta, anno, mese, giorno, ora, minuti
             )
             asc_deg = _estrai_ascendente(asc_res)
-            if isinstance(asc_deg, (int, float)):
+            if asc_deg is not None:
                 long_pianeti["Ascendente"] = float(asc_deg)
         except Exception:
             asc_res = None
@@ -437,25 +547,40 @@ def calcola_transiti_data_fissa(
         long_pianeti, include_node=include_node, include_lilith=include_lilith
     )
 
-    # adattamento per decodifica_segni: shape atteso
-    pianeti_for_decoding = {
-        k: {"gradi_eclittici": float(v), "retrogrado": False}
-        for k, v in long_pianeti.items()
-        if isinstance(v, (int, float))
-    }
-
     return {
-        "data": dt.strftime("%Y-%m-%d %H:%M"),
+        "data": _fmt_data_ora(dt),
         "asc_mc_case": asc_res,
         "pianeti": long_pianeti,
-        "pianeti_decod": decodifica_segni(pianeti_for_decoding),
+        "pianeti_decod": _decodifica_long(long_pianeti),
         "aspetti": aspetti,
     }
 
 
-def _aspect_key(a: Dict) -> Tuple[str, str, str]:
-    p1, p2 = a["pianeta1"], a["pianeta2"]
-    return (p1, p2, a["tipo"]) if p1 < p2 else (p2, p1, a["tipo"])
+_ASPECT_INDEX: Dict[str, int] = {n: k for k, n in enumerate(_ASPECT_NAMES)}
+
+
+def _aspect_key(a: Dict) -> int:
+    """
+    Chiave intera compatta di un aspetto: (i*N_PLANETS + j)*n_aspetti + k,
+    con i <= j indici in PLANET_INDEX (coppia non ordinata) e k indice del tipo.
+    """
+    i, j = PLANET_INDEX[a["pianeta1"]], PLANET_INDEX[a["pianeta2"]]
+    if i > j:
+        i, j = j, i
+    return (i * N_PLANETS + j) * len(_ASPECT_NAMES) + _ASPECT_INDEX[a["tipo"]]
+
+
+def _ordina_per_coppia(items: List[Dict], orb: Callable[[Dict], float]) -> List[Dict]:
+    """Ordina per (gradi aspetto, orb, coppia in ordine alfabetico)."""
+    return sorted(
+        items,
+        key=lambda x: (
+            ASPECTS_DEG[x["tipo"]],
+            orb(x),
+            min(x["pianeta1"], x["pianeta2"]),
+            max(x["pianeta1"], x["pianeta2"]),
+        ),
+    )
 
 
 def transiti_su_due_date(
@@ -490,13 +615,13 @@ def transiti_su_due_date(
     m1 = {_aspect_key(a): a for a in a1}
     m2 = {_aspect_key(a): a for a in a2}
 
-    k1, k2 = set(m1.keys()), set(m2.keys())
+    k1, k2 = m1.keys(), m2.keys()
     persistono_keys = k1 & k2
     entrano_keys = k2 - k1
     escono_keys = k1 - k2
 
     persistono = []
-    for k in sorted(persistono_keys):
+    for k in persistono_keys:
         a_start, a_end = m1[k], m2[k]
         persistono.append(
             {
@@ -511,7 +636,7 @@ def transiti_su_due_date(
 
     def _fmt(keys, src):
         out = []
-        for k in sorted(keys):
+        for k in keys:
             a = src[k]
             out.append(
                 {
@@ -521,45 +646,67 @@ def transiti_su_due_date(
                     "orb": a["orb"],
                 }
             )
-        return out
+        return _ordina_per_coppia(out, lambda x: x["orb"])
 
     entrano = _fmt(entrano_keys, m2)
     escono = _fmt(escono_keys, m1)
+    persistono = _ordina_per_coppia(persistono, lambda x: abs(x["variazione_orb"]))
 
     return {
         "intervallo": {"inizio": t1["data"], "fine": t2["data"]},
         "inizio": t1,
         "fine": t2,
         "differenze": {
-            "persistono": sorted(
-                persistono,
-                key=lambda x: (ASPECTS_DEG[x["tipo"]], abs(x["variazione_orb"])),
-            ),
-            "entrano": sorted(
-                entrano, key=lambda x: (ASPECTS_DEG[x["tipo"]], x["orb"])
-            ),
-            "escono": sorted(
-                escono, key=lambda x: (ASPECTS_DEG[x["tipo"]], x["orb"])
-            ),
+            "persistono": persistono,
+            "entrano": entrano,
+            "escono": escono,
         },
     }
 
 
 # ====== TRANSITI VS NATALE ====================================================
 
+@lru_cache(maxsize=4)
+def _flag_mask(include_node: bool, include_lilith: bool) -> np.ndarray:
+    """
+    Maschera (su PLANET_NAMES) dei punti ammessi dai flag Nodo/Lilith.
+    In cache e in sola lettura: usarla solo in espressioni che creano un nuovo array.
+    """
+    mask = np.ones(N_PLANETS, dtype=bool)
+    if not include_node:
+        mask[PLANET_INDEX["Nodo"]] = False
+    if not include_lilith:
+        mask[PLANET_INDEX["Lilith"]] = False
+    mask.flags.writeable = False
+    return mask
+
+
+@lru_cache(maxsize=1024)
+def _positions_cached(items: Tuple[Tuple[str, Any], ...]) -> PlanetPositions:
+    pos = _to_positions(dict(items))
+    pos.longs.flags.writeable = False
+    pos.mask.flags.writeable = False
+    return pos
+
+
+def _natal_positions(natal: Dict[str, float]) -> PlanetPositions:
+    """
+    _to_positions per il tema natale, in cache: tra gli snapshot di una stessa
+    richiesta (e tra richieste dello stesso utente) il natale non cambia.
+    """
+    try:
+        return _positions_cached(tuple(natal.items()))
+    except TypeError:  # valori non hashable
+        return _to_positions(natal)
+
+
 def _labels_for(
-    m: Dict[str, float],
+    pos: PlanetPositions,
     include_node: bool,
     include_lilith: bool,
-) -> List[str]:
-    labels: List[str] = [p for p in PIANETI_BASE if p in m]
-    if include_node and "Nodo" in m:
-        labels.append("Nodo")
-    if include_lilith and "Lilith" in m:
-        labels.append("Lilith")
-    if "Ascendente" in m:
-        labels.append("Ascendente")
-    return labels
+) -> np.ndarray:
+    """Maschera (su PLANET_NAMES) dei pianeti da considerare negli aspetti."""
+    return pos.mask & _flag_mask(include_node, include_lilith)
 
 
 def _trova_aspetti_transito(
@@ -576,72 +723,134 @@ def _trova_aspetti_transito(
     Assegna aspetti tra ogni pianeta di transito e ogni pianeta del tema natale,
     calcolando anche score di rilevanza (intensità transito * fattore natale).
     """
-    lab_tr = _labels_for(transito, include_node, include_lilith)
-    lab_na = _labels_for(natal, include_node, include_lilith)
+    tr_pos = _to_positions(transito)
+    na_pos = _natal_positions(natal)
+    mask_tr = _labels_for(tr_pos, include_node, include_lilith)
+    mask_na = _labels_for(na_pos, include_node, include_lilith)
 
     if filtra_transito:
-        lab_tr = [x for x in lab_tr if x in filtra_transito]
+        mask_tr &= _names_mask(filtra_transito)
     if filtra_natal:
-        lab_na = [x for x in lab_na if x in filtra_natal]
+        mask_na &= _names_mask(filtra_natal)
+
+    # matrice (transito x natale) delle separazioni e degli aspetti
+    idx_tr = np.flatnonzero(mask_tr)
+    idx_na = np.flatnonzero(mask_na)
+    long_tr = tr_pos.longs[idx_tr]
+    long_na = na_pos.longs[idx_na]
+    deltas = _min_delta_array(long_tr[:, None], long_na[None, :])
+    kinds, orbs = _match_aspect_array(deltas)
+
+    a, b = np.nonzero(kinds >= 0)
+    righe = _righe_aspetti_transito(
+        pt=[PLANET_NAMES[i] for i in idx_tr[a]],
+        pn=[PLANET_NAMES[i] for i in idx_na[b]],
+        tipi=[_ASPECT_NAMES[k] for k in kinds[a, b]],
+        orbs=[round(o, 3) for o in orbs[a, b].tolist()],
+        deltas=deltas[a, b].tolist(),
+        vtr=long_tr[a].tolist(),
+        vna=long_na[b].tolist(),
+        use_case=use_case,
+        profilo_natale=profilo_natale,
+    )
+    return _ordina_aspetti_transito(righe)
+
+
+# campi del record aspetto transito -> natale (ordine delle tuple di _righe_aspetti_transito)
+_ASPETTO_TRANSITO_KEYS: Tuple[str, ...] = (
+    "transito",
+    "natal",
+    "tipo",
+    "delta",  # separazione angolare
+    "orb",  # scostamento dall'aspetto perfetto
+    "long_transito",
+    "long_natal",
+    "polarita",
+    "intensita_base",
+    "fattore_natale",
+    "score",
+)
 
-    out: List[Dict] = []
-    for pt in lab_tr:
-        vtr = transito.get(pt)
-        if not isinstance(vtr, (int, float)):
-            continue
-        for pn in lab_na:
-            vna = natal.get(pn)
-            if not isinstance(vna, (int, float)):
-                continue
-            delta = _min_delta(vtr, vna)
-            m = _match_aspect(delta)
-            if not m:
-                continue
-            tipo, orb = m
 
-            pol = _calcola_polarita_aspetto(pt, tipo)
+def _righe_aspetti_transito(
+    pt: List[str],
+    pn: List[str],
+    tipi: List[str],
+    orbs: List[float],
+    deltas: List[float],
+    vtr: List[float],
+    vna: List[float],
+    use_case: str,
+    profilo_natale: Optional[Dict[str, float]],
+) -> List[Tuple]:
+    """
+    Record degli aspetti transito -> natale (liste allineate, uno per hit),
+    con score calcolato in un'unica chiamata batch. Ogni record è una tupla
+    nell'ordine di _ASPETTO_TRANSITO_KEYS: i dict si costruiscono solo dopo
+    l'ordinamento.
+    """
+    pol = [_calcola_polarita_aspetto(p, t) for p, t in zip(pt, tipi)]
 
-            # nuovo: score definitivo (transito + fattore natale)
-            score_info = calcola_score_definitivo_aspetto(
-                use_case=use_case,
-                pianeta_transito=pt,
-                pianeta_natale=pn,
-                aspetto_tipo=tipo,
-                orb=orb,
-                polarita=pol,
-                profilo_natale=profilo_natale,
-            )
+    # nuovo: score definitivo (transito + fattore natale)
+    intensita, fattore, score = calcola_score_definitivo_batch(
+        use_case, pt, pn, tipi, orbs, pol, profilo_natale
+    )
 
-            out.append(
-                {
-                    "transito": pt,
-                    "natal": pn,
-                    "tipo": tipo,
-                    "delta": round(delta, 3),  # separazione angolare
-                    "orb": round(orb, 3),  # scostamento dall'aspetto perfetto
-                    "long_transito": round(vtr, 4),
-                    "long_natal": round(vna, 4),
-                    "polarita": pol,
-                    "intensita_base": round(score_info["intensita_base"], 6),
-                    "fattore_natale": round(score_info["fattore_natale"], 6),
-                    "score": round(score_info["score_definitivo"], 6),
-                }
-            )
-    # ordina per score decrescente, poi geometria
-    out.sort(
-        key=lambda a: (
-            -a["score"],
-            ASPECTS_DEG[a["tipo"]],
-            a["orb"],
-            a["transito"],
-            a["natal"],
+    return [
+        (
+            p,
+            n,
+            t,
+            round(d, 3),
+            round(o, 3),
+            round(lt, 4),
+            round(ln, 4),
+            po,
+            round(ib, 6),
+            round(fn, 6),
+            round(sd, 6),
         )
-    )
-    return out
+        for p, n, t, d, o, lt, ln, po, ib, fn, sd in zip(
+            pt,
+            pn,
+            tipi,
+            deltas,
+            orbs,
+            vtr,
+            vna,
+            pol,
+            intensita,
+            fattore,
+            score,
+        )
+    ]
+
+
+def _ordina_aspetti_transito(righe: List[Tuple]) -> List[Dict]:
+    """Ordina le tuple di _righe_aspetti_transito e le materializza in dict."""
+    # ordina per score decrescente, poi geometria
+    righe.sort(key=lambda r: (-r[10], ASPECTS_DEG[r[2]], r[4], r[0], r[1]))
+    return [dict(zip(_ASPETTO_TRANSITO_KEYS, r)) for r in righe]
 
 
 # ---------- Tema natale riutilizzabile (per pipeline oroscopo) ----------------
 
+@lru_cache(maxsize=1024)
+def _pianeti_natali_cached(
+    data_nascita: str,
+    ora_nascita: str,
+    include_node: bool,
+    include_lilith: bool,
+) -> Tuple[Tuple[str, float], ...]:
+    """Pianeti natali di prepara_tema_natale, come tupla immutabile (è in cache)."""
+    dn = _parse_data_ora(data_nascita, ora_nascita)
+    return tuple(
+        _safe_calcola_pianeti(
+            dn.day, dn.month, dn.year, dn.hour, dn.minute, include_node, include_lilith
+        ).items()
+    )
+
+
 def prepara_tema_natale(
     citta: str,
     data_nascita: str,  # "YYYY-MM-DD"
@@ -655,12 +864,18 @@ def prepara_tema_natale(
 
     Questo evita di ricalcolare il tema per ogni snapshot (giornaliero premium,
     settimanale, mensile, annuale, ecc.).
+
+    I pianeti natali sono memoizzati per (data, ora, flag). ASC e decodifica
+    restano fuori da quella cache: calcola_asc_mc_case è già memoizzato sulle
+    coordinate risolte, così un fallback di geocodifica non resta in cache.
     """
-    dn = datetime.strptime(f"{data_nascita} {ora_nascita}", "%Y-%m-%d %H:%M")
+    dn = _parse_data_ora(data_nascita, ora_nascita)
 
     # pianeti natali (DF: per il tema va benissimo)
-    natal_long = _safe_calcola_pianeti(
-        dn.day, dn.month, dn.year, dn.hour, dn.minute, include_node, include_lilith
+    natal_long = dict(
+        _pianeti_natali_cached(
+            data_nascita, ora_nascita, bool(include_node), bool(include_lilith)
+        )
     )
 
     # ascendente natale
@@ -670,18 +885,13 @@ def prepara_tema_natale(
             citta, dn.year, dn.month, dn.day, dn.hour, dn.minute
         )
         asc_deg = _estrai_ascendente(asc_res)
-        if isinstance(asc_deg, (int, float)):
+        if asc_deg is not None:
             natal_long["Ascendente"] = float(asc_deg)
     except Exception:
         asc_res = None
 
     # per decodifica
-    natal_for_dec = {
-        k: {"gradi_eclittici": float(v), "retrogrado": False}
-        for k, v in natal_long.items()
-        if isinstance(v, (int, float))
-    }
-    natal_decod = decodifica_segni(natal_for_dec)
+    natal_decod = _decodifica_long(natal_long)
 
     return {
         "input": {
@@ -695,7 +905,7 @@ def prepara_tema_natale(
             "pianeti": natal_long,
             "pianeti_decod": natal_decod,
             "asc_mc_case": asc_res,
-            "data": dn.strftime("%Y-%m-%d %H:%M"),
+            "data": _fmt_data_ora(dn),
         },
     }
 
@@ -721,10 +931,7 @@ def transiti_vs_tema_precalc(
     use_case: "daily" | "weekly" | "monthly" | "yearly"
     profilo_natale: dict {pianeta_natale: fattore_natale}, opzionale.
     """
-    natal_block = tema_ctx["natal"]
-    natal_long = dict(natal_block.get("pianeti", {}))
-    asc_res = natal_block.get("asc_mc_case")
-    birth_info = tema_ctx.get("input", {})
+    natal_long = dict(tema_ctx["natal"].get("pianeti", {}))
 
     # transiti in 'quando'
     if usa_api_transiti:
@@ -760,13 +967,36 @@ def transiti_vs_tema_precalc(
         profilo_natale=profilo_natale,
     )
 
+    return _risultato_vs_tema(
+        tema_ctx,
+        quando,
+        tr,
+        aspetti,
+        include_node=include_node,
+        include_lilith=include_lilith,
+        filtra_transito=filtra_transito,
+        filtra_natal=filtra_natal,
+        use_case=use_case,
+    )
+
+
+def _risultato_vs_tema(
+    tema_ctx: Dict,
+    quando: datetime,
+    tr: Dict[str, float],
+    aspetti: List[Dict],
+    include_node: bool,
+    include_lilith: bool,
+    filtra_transito: Optional[List[str]],
+    filtra_natal: Optional[List[str]],
+    use_case: str,
+) -> Dict:
+    """Output di transiti_vs_tema_precalc / transiti_vs_tema_batch per uno snapshot."""
+    natal_block = tema_ctx["natal"]
+    birth_info = tema_ctx.get("input", {})
+
     # formati per decodifica transiti
-    tr_for_dec = {
-        k: {"gradi_eclittici": float(v), "retrogrado": False}
-        for k, v in tr.items()
-        if isinstance(v, (int, float))
-    }
-    tr_decod = decodifica_segni(tr_for_dec)
+    tr_decod = _decodifica_long(tr)
 
     # piccolo riassunto
     cnt: Dict[str, int] = {}
@@ -780,7 +1010,7 @@ def transiti_vs_tema_precalc(
                 "data": birth_info.get("data_nascita"),
                 "ora": birth_info.get("ora_nascita"),
             },
-            "quando": quando.strftime("%Y-%m-%d %H:%M"),
+            "quando": _fmt_data_ora(quando),
             "include_node": include_node,
             "include_lilith": include_lilith,
             "filtra_transito": filtra_transito,
@@ -791,13 +1021,94 @@ def transiti_vs_tema_precalc(
         "transito": {
             "pianeti": tr,
             "pianeti_decod": tr_decod,
-            "data": quando.strftime("%Y-%m-%d %H:%M"),
+            "data": _fmt_data_ora(quando),
         },
         "aspetti": aspetti,
         "riassunto": {"conteggio_aspetti": cnt},
     }
 
 
+def transiti_vs_tema_batch(
+    tema_ctx: Dict,
+    whens: List[datetime],
+    include_node: bool = True,
+    include_lilith: bool = True,
+    filtra_transito: Optional[List[str]] = None,
+    filtra_natal: Optional[List[str]] = None,
+    use_case: str = "daily",
+    profilo_natale: Optional[Dict[str, float]] = None,
+) -> List[Dict]:
+    """
+    Come transiti_vs_tema_precalc (transiti dal DF), ma per MOLTI snapshot
+    in una volta sola (settimanale/mensile/annuale).
+
+    Le longitudini di transito sono impilate in un array (T, N_PLANETS) e
+    separazioni + aspetti verso il natale sono calcolati con un unico
+    passaggio vettoriale sul tensore (T, N_PLANETS, N_PLANETS); i dict di
+    output vengono costruiti solo alla fine.
+
+    Ritorna una lista con un risultato per ogni elemento di whens (stesso ordine).
+    """
+    if not whens:
+        return []
+
+    natal_pos = _natal_positions(tema_ctx["natal"].get("pianeti", {}))
+    mask_na = _labels_for(natal_pos, include_node, include_lilith)
+    if filtra_natal:
+        mask_na &= _names_mask(filtra_natal)
+
+    # transiti (T, N_PLANETS) dal DF
+    trs = [
+        _safe_calcola_pianeti(
+            q.day, q.month, q.year, q.hour, q.minute, include_node, include_lilith
+        )
+        for q in whens
+    ]
+    tr_longs = np.stack([_to_positions(tr).longs for tr in trs])
+    mask_tr = ~np.isnan(tr_longs) & _flag_mask(include_node, include_lilith)
+    if filtra_transito:
+        mask_tr &= _names_mask(filtra_transito)
+
+    # tensore (T, transito, natale)
+    deltas = _min_delta_array(tr_longs[:, :, None], natal_pos.longs[None, None, :])
+    kinds, orbs = _match_aspect_array(deltas)
+    kinds[~(mask_tr[:, :, None] & mask_na[None, None, :])] = -1
+
+    # score di tutti gli hit (di tutti gli snapshot) in un'unica chiamata batch
+    t_idx, a, b = np.nonzero(kinds >= 0)
+    righe_tutte = _righe_aspetti_transito(
+        pt=[PLANET_NAMES[i] for i in a],
+        pn=[PLANET_NAMES[i] for i in b],
+        tipi=[_ASPECT_NAMES[k] for k in kinds[t_idx, a, b]],
+        orbs=[round(o, 3) for o in orbs[t_idx, a, b].tolist()],
+        deltas=deltas[t_idx, a, b].tolist(),
+        vtr=tr_longs[t_idx, a].tolist(),
+        vna=natal_pos.longs[b].tolist(),
+        use_case=use_case,
+        profilo_natale=profilo_natale,
+    )
+    per_snapshot: List[List[Tuple]] = [[] for _ in whens]
+    for t, riga in zip(t_idx.tolist(), righe_tutte):
+        per_snapshot[t].append(riga)
+
+    out: List[Dict] = []
+    for quando, tr, righe in zip(whens, trs, per_snapshot):
+        out.append(
+            _risultato_vs_tema(
+                tema_ctx,
+                quando,
+                tr,
+                _ordina_aspetti_transito(righe),
+                include_node=include_node,
+                include_lilith=include_lilith,
+                filtra_transito=filtra_transito,
+                filtra_natal=filtra_natal,
+                use_case=use_case,
+            )
+        )
+    return out
+
+
 def transiti_vs_natal_in_data(
     citta: str,
     data_nascita: str,  # "YYYY-MM-DD"
@@ -821,7 +1132,7 @@ def transiti_vs_natal_in_data(
     profilo_natale: dict {pianeta_natale: fattore_natale}, opzionale.
     """
     # parse nascita
-    dn = datetime.strptime(f"{data_nascita} {ora_nascita}", "%Y-%m-%d %H:%M")
+    dn = _parse_data_ora(data_nascita, ora_nascita)
 
     # tema natale (DF)
     natal_long = _safe_calcola_pianeti(
@@ -835,7 +1146,7 @@ def transiti_vs_natal_in_data(
             citta, dn.year, dn.month, dn.day, dn.hour, dn.minute
         )
         asc_deg = _estrai_ascendente(asc_res)
-        if isinstance(asc_deg, (int, float)):
+        if asc_deg is not None:
             natal_long["Ascendente"] = float(asc_deg)
     except Exception:
         asc_res = None
@@ -863,18 +1174,6 @@ def transiti_vs_natal_in_data(
         profilo_natale=profilo_natale,
     )
 
-    # formati "decodifica"
-    natal_for_dec = {
-        k: {"gradi_eclittici": float(v), "retrogrado": False}
-        for k, v in natal_long.items()
-        if isinstance(v, (int, float))
-    }
-    tr_for_dec = {
-        k: {"gradi_eclittici": float(v), "retrogrado": False}
-        for k, v in tr.items()
-        if isinstance(v, (int, float))
-    }
-
     # piccolo riassunto
     cnt: Dict[str, int] = {}
     for a in aspetti:
@@ -887,7 +1186,7 @@ def transiti_vs_natal_in_data(
                 "data": data_nascita,
                 "ora": ora_nascita,
             },
-            "quando": quando.strftime("%Y-%m-%d %H:%M"),
+            "quando": _fmt_data_ora(quando),
             "include_node": include_node,
             "include_lilith": include_lilith,
             "filtra_transito": filtra_transito,
@@ -896,14 +1195,14 @@ def transiti_vs_natal_in_data(
         },
         "natal": {
             "pianeti": natal_long,
-            "pianeti_decod": decodifica_segni(natal_for_dec),
+            "pianeti_decod": _decodifica_long(natal_long),
             "asc_mc_case": asc_res,
-            "data": dn.strftime("%Y-%m-%d %H:%M"),
+            "data": _fmt_data_ora(dn),
         },
         "transito": {
             "pianeti": tr,
-            "pianeti_decod": decodifica_segni(tr_for_dec),
-            "data": quando.strftime("%Y-%m-%d %H:%M"),
+            "pianeti_decod": _decodifica_long(tr),
+            "data": _fmt_data_ora(quando),
         },
         "aspetti": aspetti,
         "riassunto": {"conteggio_aspetti": cnt},
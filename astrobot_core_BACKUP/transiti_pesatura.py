@@ -17,7 +17,7 @@ Si appoggia alle informazioni di:
 """
 
 from __future__ import annotations
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence, Tuple
 
 # ---------------------------------------------------------------------------
 # Costanti use case e tipi di configurazione
@@ -431,3 +431,32 @@ def calcola_score_definitivo_aspetto(
         "fattore_natale": float(fattore_natale),
         "score_definitivo": float(score_def),
     }
+
+
+def calcola_score_definitivo_batch(
+    use_case: str,
+    pianeti_transito: Sequence[str],
+    pianeti_natale: Sequence[str],
+    aspetti_tipo: Sequence[str],
+    orbs: Sequence[float],
+    polarita: Optional[Sequence[float]] = None,
+    profilo_natale: Optional[Dict[str, float]] = None,
+) -> Tuple[List[float], List[float], List[float]]:
+    """
+    Versione batch di calcola_score_definitivo_aspetto: stessi valori, ma per
+    N aspetti in una sola chiamata (use_case e profilo_natale sono comuni).
+
+    Ritorna tre liste di lunghezza N:
+      (intensita_base, fattore_natale, score_definitivo)
+    """
+    if polarita is None:
+        polarita = [None] * len(orbs)
+    intensita = [
+        calcola_intensita_aspetto(use_case, p, t, o, pol)
+        for p, t, o, pol in zip(pianeti_transito, aspetti_tipo, orbs, polarita)
+    ]
+    if profilo_natale is not None:
+        fattore = [profilo_natale.get(p, 1.0) for p in pianeti_natale]
+    else:
+        fattore = [1.0] * len(intensita)
+    return intensita, fattore, [i * f for i, f in zip(intensita, fattore)]
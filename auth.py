@@ -1,12 +1,21 @@
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 import os
 import logging
+import re
+import time
 
 import jwt
+from jwt.algorithms import RSAAlgorithm
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:  # orjson è opzionale: senza, resta il json della stdlib
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(
@@ -16,6 +25,16 @@ oauth2_scheme = OAuth2PasswordBearer(
 
 ISSUER = os.getenv("AUTH_ISSUER", "astrobot-auth-pub")
 AUDIENCE = os.getenv("AUTH_AUDIENCE", "chatbot-test")
+LEEWAY = 30
+
+# forma compatta JWS: header.payload.firma in base64url. Un token che non la
+# rispetta (o esageratamente lungo) viene scartato senza passare da PyJWT.
+_JWT_COMPACT_RE = re.compile(r"[A-Za-z0-9_\-=]+\.[A-Za-z0-9_\-=]+\.[A-Za-z0-9_\-=]*")
+_JWT_MAX_LEN = 8192
+
+# token già verificati -> (istante oltre il quale PyJWT li darebbe scaduti, utente)
+_TOKEN_CACHE: Dict[str, Tuple[float, "UserContext"]] = {}
+_TOKEN_CACHE_MAX = 4096
 
 
 def _load_public_key() -> bytes:
@@ -62,18 +81,65 @@ def _load_public_key() -> bytes:
         raise RuntimeError(f"Missing public key file at {path}: {e}")
 
 
+@lru_cache(maxsize=1)
+def _get_public_key() -> Any:
+    """
+    Chiave pubblica letta e parsata UNA volta per processo: prima la lettura
+    del PEM (file/env + log) e il parsing RSA avvenivano a ogni richiesta.
+    """
+    return RSAAlgorithm(RSAAlgorithm.SHA256).prepare_key(_load_public_key())
+
+
+class _OrjsonPyJWT(jwt.PyJWT):
+    """PyJWT che decodifica il payload (bytes) con orjson invece di json.loads."""
+
+    def _decode_payload(self, decoded: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            payload = orjson.loads(decoded["payload"])
+        except (ValueError, RecursionError) as e:
+            raise jwt.DecodeError(f"Invalid payload string: {e}") from e
+        if not isinstance(payload, dict):
+            raise jwt.DecodeError("Invalid payload string: must be a json object")
+        return payload
+
+
+_jwt = _OrjsonPyJWT() if orjson is not None else jwt.PyJWT()
+
+
 class UserContext(BaseModel):
     sub: str
     role: str = "free"
 
 
+def _cache_token(token: str, exp: Any, user: UserContext) -> None:
+    if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+        # evizione pigra: prima gli scaduti, poi (se serve) il più vecchio
+        now = time.time()
+        for t in [t for t, (scad, _) in _TOKEN_CACHE.items() if scad <= now]:
+            del _TOKEN_CACHE[t]
+        while len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+            del _TOKEN_CACHE[next(iter(_TOKEN_CACHE))]
+    _TOKEN_CACHE[token] = (float(exp) + LEEWAY, user)
+
+
 def decode_token_verified(token: str) -> UserContext:
-    public_key = _load_public_key()
+    # token già verificato e non ancora scaduto: stessa risposta di jwt.decode
+    hit = _TOKEN_CACHE.get(token)
+    if hit is not None:
+        if time.time() < hit[0]:
+            return hit[1]
+        _TOKEN_CACHE.pop(token, None)
+
+    if len(token) > _JWT_MAX_LEN or _JWT_COMPACT_RE.fullmatch(token) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token: malformed JWT",
+        )
 
     try:
-        data = jwt.decode(
+        data = _jwt.decode(
             token,
-            key=public_key,
+            key=_get_public_key(),
             algorithms=["RS256"],
             issuer=ISSUER,
             audience=AUDIENCE,
@@ -81,7 +147,7 @@ def decode_token_verified(token: str) -> UserContext:
                 "require": ["sub", "iss", "aud", "iat", "exp"],
                 "verify_exp": True,
             },
-            leeway=30,
+            leeway=LEEWAY,
         )
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -104,7 +170,13 @@ def decode_token_verified(token: str) -> UserContext:
             detail="Token without sub",
         )
 
-    return UserContext(sub=sub, role=role)
+    # claim già stringhe: la validazione pydantic non avrebbe nulla da fare
+    if type(sub) is str and type(role) is str:
+        user = UserContext.model_construct(sub=sub, role=role)
+    else:
+        user = UserContext(sub=sub, role=role)
+    _cache_token(token, data["exp"], user)
+    return user
 
 
 async def get_current_user(
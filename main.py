@@ -3,7 +3,8 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List, Literal  # ← AGGIUNTO Literal
-import time, uuid
+import secrets, time, uuid
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -200,15 +201,23 @@ COOKIE_SESSION_COUNT = "astro_session_count"
 COOKIE_TIER = "astro_tier"
 
 
+@dataclass(frozen=True, slots=True)
+class CookieCtx:
+    user_id: str
+    session_count: int
+    tier_cookie: Optional[str]
+
+
 def get_or_set_cookies(
     response: Response,
     astro_user_id: Optional[str] = Cookie(default=None, alias=COOKIE_USER_ID),
     astro_session_count: Optional[str] = Cookie(default=None, alias=COOKIE_SESSION_COUNT),
     astro_tier: Optional[str] = Cookie(default=None, alias=COOKIE_TIER),
-) -> Dict[str, Any]:
+) -> CookieCtx:
     new_user_id = astro_user_id
     if not new_user_id:
-        new_user_id = str(uuid.uuid4())
+        # id opaco: basta un token casuale, senza passare da un oggetto UUID
+        new_user_id = secrets.token_urlsafe(16)
         response.set_cookie(key=COOKIE_USER_ID, value=new_user_id, httponly=True, samesite="lax")
     try:
         count = int(astro_session_count) if astro_session_count is not None else 0
@@ -216,7 +225,7 @@ def get_or_set_cookies(
         count = 0
     count += 1
     response.set_cookie(key=COOKIE_SESSION_COUNT, value=str(count), httponly=True, samesite="lax")
-    return {"user_id": new_user_id, "session_count": count, "tier_cookie": astro_tier}
+    return CookieCtx(user_id=new_user_id, session_count=count, tier_cookie=astro_tier)
 
 
 def _label_map_for_lang(lang: str) -> Dict[str, str]:
@@ -325,12 +334,18 @@ except Exception as e:
 # ---------------------------------------------------------
 # ROOT
 # ---------------------------------------------------------
+# index.html letto una sola volta all'import: un riavvio lo ricarica.
+_INDEX_PATH = Path(__file__).parent / "index.html"
+_INDEX_HTML = (
+    _INDEX_PATH.read_bytes()
+    if _INDEX_PATH.exists()
+    else b"<h1>AstroBot</h1><p>index.html non trovato.</p>"
+)
+
+
 @app.get("/", response_class=HTMLResponse, tags=["Root"])
 def root():
-    index_path = Path(__file__).parent / "index.html"
-    if not index_path.exists():
-        return "<h1>AstroBot</h1><p>index.html non trovato.</p>"
-    return index_path.read_text(encoding="utf-8")
+    return HTMLResponse(content=_INDEX_HTML)
 
 
 print("[DEBUG] main import end")
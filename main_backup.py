@@ -1,10 +1,12 @@
-from fastapi import FastAPI, Depends, Response, Cookie
+from fastapi import FastAPI, Depends, Response, Cookie, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List, Literal  # ← AGGIUNTO Literal
-import time, uuid
-from datetime import datetime
+import asyncio, os, secrets, threading, time, uuid
+import base64, hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 load_dotenv()
@@ -114,6 +116,8 @@ class TemaRequest(BaseModel):
     domanda: Optional[str] = None
     scope: Optional[str] = "tema"
     tier: Optional[str] = "free"
+    # True -> la carta arriva solo via carta_url (niente base64 nel JSON)
+    carta_solo_url: bool = False
 
 
 class TemaResponse(BaseModel):
@@ -127,6 +131,7 @@ class TemaResponse(BaseModel):
     carta_error: Optional[str] = None
     grafico_polare: Optional[Dict[str, Any]] = None
     png_base64: Optional[str] = None
+    carta_url: Optional[str] = None  # stesso PNG in binario (GET /carta.png)
     role: Optional[str] = None   # 👈 ruolo effettivo (free/premium) letto dal token
 
 
@@ -142,6 +147,7 @@ class SinastriaRequest(BaseModel):
     B: Persona
     scope: Optional[str] = "sinastria"
     tier: Optional[str] = "free"
+    carta_solo_url: bool = False  # come TemaRequest
 
 
 class SinastriaResponse(BaseModel):
@@ -151,6 +157,7 @@ class SinastriaResponse(BaseModel):
     sinastria: Optional[Dict[str, Any]] = None
     grafico_polare: Optional[Dict[str, Any]] = None
     png_base64: Optional[str] = None
+    carta_url: Optional[str] = None
     carta_error: Optional[str] = None
 
 
@@ -200,15 +207,23 @@ COOKIE_SESSION_COUNT = "astro_session_count"
 COOKIE_TIER = "astro_tier"
 
 
+@dataclass(frozen=True, slots=True)
+class CookieCtx:
+    user_id: str
+    session_count: int
+    tier_cookie: Optional[str]
+
+
 def get_or_set_cookies(
     response: Response,
     astro_user_id: Optional[str] = Cookie(default=None, alias=COOKIE_USER_ID),
     astro_session_count: Optional[str] = Cookie(default=None, alias=COOKIE_SESSION_COUNT),
     astro_tier: Optional[str] = Cookie(default=None, alias=COOKIE_TIER),
-) -> Dict[str, Any]:
+) -> CookieCtx:
     new_user_id = astro_user_id
     if not new_user_id:
-        new_user_id = str(uuid.uuid4())
+        # id opaco: basta un token casuale, senza passare da un oggetto UUID
+        new_user_id = secrets.token_urlsafe(16)
         response.set_cookie(key=COOKIE_USER_ID, value=new_user_id, httponly=True, samesite="lax")
     try:
         count = int(astro_session_count) if astro_session_count is not None else 0
@@ -216,7 +231,7 @@ def get_or_set_cookies(
         count = 0
     count += 1
     response.set_cookie(key=COOKIE_SESSION_COUNT, value=str(count), httponly=True, samesite="lax")
-    return {"user_id": new_user_id, "session_count": count, "tier_cookie": astro_tier}
+    return CookieCtx(user_id=new_user_id, session_count=count, tier_cookie=astro_tier)
 
 
 def _label_map_for_lang(lang: str) -> Dict[str, str]:
@@ -228,11 +243,71 @@ def _label_map_for_lang(lang: str) -> Dict[str, str]:
     return {"energy": "Energia", "emotions": "Emozioni", "relationships": "Relazioni", "work": "Lavoro", "luck": "Fortuna"}
 
 
+def _eco_input(payload: BaseModel) -> Dict[str, Any]:
+    """
+    Campi della richiesta come dict per il campo `input` della risposta:
+    stessa forma di model_dump(), ma copiando __dict__ senza serializer.
+    """
+    return {
+        k: _eco_input(v) if isinstance(v, BaseModel) else v
+        for k, v in payload.__dict__.items()
+    }
+
+
 def _blank_png_no_prefix() -> str:
     # PNG 1x1 trasparente, senza prefisso data:image
     return "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4nGNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
 
 
+# Pool dedicato per calcolo + render delle carte: il disegno è comunque
+# serializzato in grafici.py, quindi pochi thread bastano e non occupano
+# il threadpool condiviso di FastAPI (usato dagli altri endpoint sync).
+# /sinastria vi manda anche i due temi in parallelo (vedi _temi_sinastria).
+_CARTE_POOL = ThreadPoolExecutor(
+    max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="carte"
+)
+
+
+async def _in_carte_pool(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_CARTE_POOL, func, *args)
+
+
+# Ultime carte generate, in binario: GET /carta.png le serve come image/png,
+# senza il +33% del base64 nel JSON. Cache per processo (FIFO con tetto),
+# scritta dai thread di _CARTE_POOL.
+_CARTE_PNG: Dict[str, bytes] = {}
+_CARTE_PNG_MAX = 128
+_CARTE_PNG_LOCK = threading.Lock()
+
+
+_PNG_DATA_URI = "data:image/png;base64,"
+
+
+def _data_uri_png(b64: Optional[str]) -> Optional[str]:
+    """
+    Prefisso data URI per il campo png_base64. Le funzioni di grafici.py
+    restituiscono sempre base64 nudo: si concatena una volta, senza controlli.
+    """
+    return _PNG_DATA_URI + b64 if b64 else b64
+
+
+def _pubblica_carta(png: Optional[bytes], solo_url: bool):
+    """
+    Registra i byte PNG per GET /carta.png e ritorna (carta_base64, carta_url).
+    Con solo_url il base64 non viene nemmeno calcolato.
+    """
+    if not png:
+        return None, None
+    chart_id = hashlib.blake2b(png, digest_size=16).hexdigest()
+    with _CARTE_PNG_LOCK:
+        if chart_id not in _CARTE_PNG:
+            while len(_CARTE_PNG) >= _CARTE_PNG_MAX:
+                del _CARTE_PNG[next(iter(_CARTE_PNG))]
+            _CARTE_PNG[chart_id] = png
+    carta_base64 = None if solo_url else base64.b64encode(png).decode("ascii")
+    return carta_base64, f"/carta.png?chart_id={chart_id}"
+
+
 # 👇 AGGIUNTO: risoluzione tier per il sito
 def _resolve_tier_for_site(req_tier: str) -> str:
     """
@@ -276,36 +351,26 @@ print("[DEBUG] auth routes defined")
 # ---------------------------------------------------------
 # /tema — PROTETTO CON JWT da astrobot_auth + FALLBACK
 # ---------------------------------------------------------
-@app.post("/tema", response_model=TemaResponse, tags=["Tema"])
-def tema_endpoint(
-    payload: TemaRequest,
-    response: Response,
-    cookie_ctx: Dict[str, Any] = Depends(get_or_set_cookies),
-    user: UserContext = Depends(get_current_user),  # 👈 legge sub + role dal token Bearer
-):
-    start = time.time()
-
-    # Tier effettivo preso DAL TOKEN (role = "free" | "premium")
-    effective_role = getattr(user, "role", None) or (payload.tier or "free")
-
-    # Salviamo comunque il tier in cookie per debug/tracking frontend
-    response.set_cookie(key=COOKIE_TIER, value=effective_role, httponly=False, samesite="lax")
-
+def _calcola_tema(payload: TemaRequest, effective_role: str):
+    """
+    Parte bloccante di /tema, gating free/premium compreso:
+    (tema, carta_base64, carta_url, carta_error, grafico_polare).
+    """
     tema = None
-    carta_base64 = None
+    carta_png = None
     carta_error = None
     grafico_polare = None
 
     try:
         # PROVA A USARE I CALCOLI REALI (se astrobot_core è installato)
-        from astrobot_core.transiti import calcola_transiti_data_fissa
+        from astrobot_core.transiti import _parse_data_ora, calcola_transiti_data_fissa
         try:
             from astrobot_core.grafici import grafico_tema_natal
             _use_blank = False
         except Exception:
             _use_blank = True
 
-        dt = datetime.strptime(f"{payload.data} {payload.ora}", "%Y-%m-%d %H:%M")
+        dt = _parse_data_ora(payload.data, payload.ora)
         tema_raw = calcola_transiti_data_fissa(
             giorno=dt.day,
             mese=dt.month,
@@ -333,12 +398,13 @@ def tema_endpoint(
         }
 
         if _use_blank:
-            carta_base64 = _blank_png_no_prefix()
+            carta_png = base64.b64decode(_blank_png_no_prefix())
         else:
-            carta_base64 = grafico_tema_natal(
+            carta_png = grafico_tema_natal(
                 pianeti_decod=pianeti_decod,
                 asc_mc_case=asc_mc_case,
                 aspetti=aspetti,
+                binario=True,
             )
 
         # JSON leggero per frontend (se abbiamo dati veri)
@@ -388,32 +454,52 @@ def tema_endpoint(
             "note": "Fallback: astrobot_core non installato, tema simulato.",
         }
         grafico_polare = None
-        if effective_role == "premium":
-            carta_base64 = _blank_png_no_prefix()
+        carta_png = base64.b64decode(_blank_png_no_prefix())
 
     except Exception as e:
         carta_error = f"Errore generazione tema/carta: {e}"
 
+    # 👇 GATING FREE/PREMIUM:
+    # - FREE    -> niente carta_base64 / png_base64 / carta_url
+    # - PREMIUM -> carta se disponibile
+    if effective_role != "premium":
+        carta_png = None
+    carta_base64, carta_url = _pubblica_carta(carta_png, payload.carta_solo_url)
+
+    return tema, carta_base64, carta_url, carta_error, grafico_polare
+
+
+@app.post("/tema", response_model=TemaResponse, tags=["Tema"])
+async def tema_endpoint(
+    payload: TemaRequest,
+    response: Response,
+    cookie_ctx: CookieCtx = Depends(get_or_set_cookies),
+    user: UserContext = Depends(get_current_user),  # 👈 legge sub + role dal token Bearer
+):
+    start = time.time()
+
+    # Tier effettivo preso DAL TOKEN (role = "free" | "premium")
+    effective_role = getattr(user, "role", None) or (payload.tier or "free")
+
+    # Salviamo comunque il tier in cookie per debug/tracking frontend
+    response.set_cookie(key=COOKIE_TIER, value=effective_role, httponly=False, samesite="lax")
+
+    # calcoli + render sono CPU-bound: girano in _CARTE_POOL,
+    # l'event loop resta libero per le altre richieste
+    tema, carta_base64, carta_url, carta_error, grafico_polare = await _in_carte_pool(
+        _calcola_tema, payload, effective_role
+    )
+
     interpretazione = None
     interpretazione_error = "Interpretazione disabilitata."
 
     elapsed = time.time() - start
-
-    png_base64 = carta_base64
-    if png_base64 and not png_base64.startswith("data:image/png;base64,"):
-        png_base64 = "data:image/png;base64," + png_base64
-
-    # 👇 GATING FREE/PREMIUM:
-    # - FREE    -> niente carta_base64 / png_base64
-    # - PREMIUM -> carta_base64 + png_base64 se disponibili
-    if effective_role != "premium":
-        carta_base64 = None
-        png_base64 = None
+    png_base64 = _data_uri_png(carta_base64)
 
     return TemaResponse(
         status="ok",
         elapsed=elapsed,
-        input=payload.model_dump(),
+        input=_eco_input(payload),
         tema=tema,
         interpretazione=interpretazione,
         interpretazione_error=interpretazione_error,
@@ -421,6 +507,7 @@ def tema_endpoint(
         carta_error=carta_error,
         grafico_polare=grafico_polare,
         png_base64=png_base64,
+        carta_url=carta_url,
         role=effective_role,
     )
 
@@ -431,36 +518,46 @@ print("[DEBUG] /tema defined")
 # ---------------------------------------------------------
 # /sinastria — import pigri + fallback grafico (NON ancora protetta da JWT)
 # ---------------------------------------------------------
-@app.post("/sinastria", response_model=SinastriaResponse, tags=["Sinastria"])
-def sinastria_endpoint(
-    payload: SinastriaRequest,
-    response: Response,
-    cookie_ctx: Dict[str, Any] = Depends(get_or_set_cookies),
-):
-    start = time.time()
+async def _temi_sinastria(payload: SinastriaRequest):
+    """
+    I due temi di /sinastria, in parallelo su _CARTE_POOL: il guadagno è sulla
+    geocodifica online. Con la stessa città vanno in sequenza, così B trova
+    la geocodifica già in cache.
+    """
+    from astrobot_core.sinastria import tema_statico
+    from astrobot_core.transiti import _parse_data_ora
+
+    dt_a = _parse_data_ora(payload.A.data, payload.A.ora)
+    dt_b = _parse_data_ora(payload.B.data, payload.B.ora)
+
+    if payload.A.citta.lower().strip() == payload.B.citta.lower().strip():
+        tema_A = await _in_carte_pool(tema_statico, dt_a, payload.A.citta)
+        return tema_A, await _in_carte_pool(tema_statico, dt_b, payload.B.citta)
+    return await asyncio.gather(
+        _in_carte_pool(tema_statico, dt_a, payload.A.citta),
+        _in_carte_pool(tema_statico, dt_b, payload.B.citta),
+    )
 
-    if payload.tier:
-        response.set_cookie(key=COOKIE_TIER, value=payload.tier, httponly=False, samesite="lax")
 
+def _calcola_sinastria(payload: SinastriaRequest, tema_A_core: Dict, tema_B_core: Dict):
+    """
+    Parte bloccante di /sinastria a temi già calcolati:
+    (sinastria_data, carta_base64, carta_url, carta_error, grafico_polare).
+    """
     sinastria_data = None
-    carta_base64 = None
+    carta_png = None
     carta_error = None
     grafico_polare = None
 
     try:
-        from astrobot_core.sinastria import sinastria as calcola_sinastria
+        from astrobot_core.sinastria import sinastria_da_temi
         try:
             from astrobot_core.grafici import grafico_sinastria
             _use_blank = False
         except Exception:
             _use_blank = True
 
-        dt_a = datetime.strptime(f"{payload.A.data} {payload.A.ora}", "%Y-%m-%d %H:%M")
-        dt_b = datetime.strptime(f"{payload.B.data} {payload.B.ora}", "%Y-%m-%d %H:%M")
-
-        sin_core = calcola_sinastria(
-            dt_A=dt_a, citta_A=payload.A.citta, dt_B=dt_b, citta_B=payload.B.citta
-        )
+        sin_core = sinastria_da_temi(tema_A_core, tema_B_core)
         tema_A, tema_B = sin_core.get("A", {}) or {}, sin_core.get("B", {}) or {}
         sin_info = sin_core.get("sinastria", {}) or {}
         aspetti_AB = sin_info.get("aspetti_AB", []) or []
@@ -476,14 +573,15 @@ def sinastria_endpoint(
         }
 
         if _use_blank:
-            carta_base64 = _blank_png_no_prefix()
+            carta_png = base64.b64decode(_blank_png_no_prefix())
         else:
-            carta_base64 = grafico_sinastria(
+            carta_png = grafico_sinastria(
                 pianeti_A_decod=tema_A.get("pianeti_decod", {}) or {},
                 pianeti_B_decod=tema_B.get("pianeti_decod", {}) or {},
                 aspetti_AB=aspetti_AB,
                 nome_A=payload.A.nome or "A",
                 nome_B=payload.B.nome or "B",
+                binario=True,
             )
 
         # JSON leggero sinastria
@@ -519,18 +617,42 @@ def sinastria_endpoint(
     except Exception as e:
         carta_error = f"Errore generazione sinastria/carta: {e}"
 
+    carta_base64, carta_url = _pubblica_carta(carta_png, payload.carta_solo_url)
+    return sinastria_data, carta_base64, carta_url, carta_error, grafico_polare
+
+
+@app.post("/sinastria", response_model=SinastriaResponse, tags=["Sinastria"])
+async def sinastria_endpoint(
+    payload: SinastriaRequest,
+    response: Response,
+    cookie_ctx: CookieCtx = Depends(get_or_set_cookies),
+):
+    start = time.time()
+
+    if payload.tier:
+        response.set_cookie(key=COOKIE_TIER, value=payload.tier, httponly=False, samesite="lax")
+
+    try:
+        tema_A_core, tema_B_core = await _temi_sinastria(payload)
+    except Exception as e:
+        sinastria_data = carta_base64 = carta_url = grafico_polare = None
+        carta_error = f"Errore generazione sinastria/carta: {e}"
+    else:
+        sinastria_data, carta_base64, carta_url, carta_error, grafico_polare = await _in_carte_pool(
+            _calcola_sinastria, payload, tema_A_core, tema_B_core
+        )
+
     elapsed = time.time() - start
-    png_base64 = carta_base64
-    if png_base64 and not png_base64.startswith("data:image/png;base64,"):
-        png_base64 = "data:image/png;base64," + png_base64
+    png_base64 = _data_uri_png(carta_base64)
 
     return SinastriaResponse(
         status="ok",
         elapsed=elapsed,
-        input=payload.model_dump(),
+        input=_eco_input(payload),
         sinastria=sinastria_data,
         grafico_polare=grafico_polare,
         png_base64=png_base64,
+        carta_url=carta_url,
         carta_error=carta_error,
     )
 
@@ -538,6 +660,15 @@ def sinastria_endpoint(
 print("[DEBUG] /sinastria defined")
 
 
+@app.get("/carta.png", tags=["Carta"])
+def carta_png(chart_id: str):
+    """PNG di una carta generata da /tema o /sinastria (vedi carta_url)."""
+    png = _CARTE_PNG.get(chart_id)
+    if png is None:
+        raise HTTPException(status_code=404, detail="Carta non trovata o scaduta")
+    return Response(content=png, media_type="image/png")
+
+
 # ---------------------------------------------------------
 # /transiti/premium — import pigri + fallback
 # ---------------------------------------------------------
@@ -545,7 +676,7 @@ print("[DEBUG] /sinastria defined")
 def transiti_premium_endpoint(
     payload: TransitiPremiumRequest,
     response: Response,
-    cookie_ctx: Dict[str, Any] = Depends(get_or_set_cookies),
+    cookie_ctx: CookieCtx = Depends(get_or_set_cookies),
 ):
     start = time.time()
 
@@ -582,8 +713,7 @@ def transiti_premium_endpoint(
             )
             png_base64 = img_b64
 
-        if png_base64 and not png_base64.startswith("data:image/png;base64,"):
-            png_base64 = "data:image/png;base64," + png_base64
+        png_base64 = _data_uri_png(png_base64)
 
     except Exception as e:
         carta_error = f"Errore generazione grafico transiti premium: {e}"
@@ -593,7 +723,7 @@ def transiti_premium_endpoint(
     return TransitiPremiumResponse(
         status="ok" if png_base64 else "error",
         elapsed=elapsed,
-        input=payload.model_dump(),
+        input=_eco_input(payload),
         png_base64=png_base64,
         carta_error=carta_error,
     )
@@ -654,12 +784,18 @@ except Exception as e:
 # ---------------------------------------------------------
 # ROOT
 # ---------------------------------------------------------
+# index.html letto una sola volta all'import: un riavvio lo ricarica.
+_INDEX_PATH = Path(__file__).parent / "index.html"
+_INDEX_HTML = (
+    _INDEX_PATH.read_bytes()
+    if _INDEX_PATH.exists()
+    else b"<h1>AstroBot</h1><p>index.html non trovato.</p>"
+)
+
+
 @app.get("/", response_class=HTMLResponse, tags=["Root"])
 def root():
-    index_path = Path(__file__).parent / "index.html"
-    if not index_path.exists():
-        return "<h1>AstroBot</h1><p>index.html non trovato.</p>"
-    return index_path.read_text(encoding="utf-8")
+    return HTMLResponse(content=_INDEX_HTML)
 
 
 print("[DEBUG] main import end")
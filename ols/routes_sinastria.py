@@ -24,6 +24,21 @@ class SinastriaRequest(BaseModel):
     tier: str = "free"
 
 
+def _pianeti_serie(pianeti_decod: Dict[str, Any], r: float) -> list:
+    return [
+        {
+            "nome": nome,
+            "segno": info.get("segno"),
+            "gradi_segno": info.get("gradi_segno"),
+            "gradi_eclittici": info.get("gradi_eclittici"),
+            "retrogrado": info.get("retrogrado", False),
+            "theta": info.get("gradi_eclittici"),
+            "r": r,
+        }
+        for nome, info in (pianeti_decod or {}).items()
+    ]
+
+
 def build_grafico_sinastria_json(result: Dict[str, Any]) -> Dict[str, Any]:
     """
     result: dict restituito da calcola_sinastria,
@@ -31,40 +46,16 @@ def build_grafico_sinastria_json(result: Dict[str, Any]) -> Dict[str, Any]:
     - result["A"]["pianeti_decod"]
     - result["B"]["pianeti_decod"]
     """
-    serie = []
-
     tema_A = result.get("A", {})
     tema_B = result.get("B", {})
 
-    pianeti_A = []
-    for nome, info in (tema_A.get("pianeti_decod", {}) or {}).items():
-        pianeti_A.append({
-            "nome": nome,
-            "segno": info.get("segno"),
-            "gradi_segno": info.get("gradi_segno"),
-            "gradi_eclittici": info.get("gradi_eclittici"),
-            "retrogrado": info.get("retrogrado", False),
-            "theta": info.get("gradi_eclittici"),
-            "r": 1.0,
-        })
-    serie.append({"serie": "A", "pianeti": pianeti_A})
-
-    pianeti_B = []
-    for nome, info in (tema_B.get("pianeti_decod", {}) or {}).items():
-        pianeti_B.append({
-            "nome": nome,
-            "segno": info.get("segno"),
-            "gradi_segno": info.get("gradi_segno"),
-            "gradi_eclittici": info.get("gradi_eclittici"),
-            "retrogrado": info.get("retrogrado", False),
-            "theta": info.get("gradi_eclittici"),
-            "r": 0.8,  # r diverso per distinguerli
-        })
-    serie.append({"serie": "B", "pianeti": pianeti_B})
-
     return {
         "tipo": "sinastria_polare",
-        "serie": serie,
+        "serie": [
+            {"serie": "A", "pianeti": _pianeti_serie(tema_A.get("pianeti_decod", {}), 1.0)},
+            # r diverso per distinguerli
+            {"serie": "B", "pianeti": _pianeti_serie(tema_B.get("pianeti_decod", {}), 0.8)},
+        ],
     }
 
 
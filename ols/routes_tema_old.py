@@ -28,9 +28,8 @@ def build_grafico_tema_json(tema: Dict[str, Any]) -> Dict[str, Any]:
     pianeti_decod = tema.get("pianeti_decod", {})
     asc_mc_case = tema.get("asc_mc_case", {})
 
-    pianeti = []
-    for nome, info in pianeti_decod.items():
-        pianeti.append({
+    pianeti = [
+        {
             "nome": nome,
             "segno": info.get("segno"),
             "gradi_segno": info.get("gradi_segno"),
@@ -38,15 +37,12 @@ def build_grafico_tema_json(tema: Dict[str, Any]) -> Dict[str, Any]:
             "retrogrado": info.get("retrogrado", False),
             "theta": info.get("gradi_eclittici"),
             "r": 1.0,
-        })
+        }
+        for nome, info in pianeti_decod.items()
+    ]
 
     case_raw = asc_mc_case.get("case", []) or []
-    case = []
-    for idx, start_deg in enumerate(case_raw, start=1):
-        case.append({
-            "casa": idx,
-            "inizio": start_deg,
-        })
+    case = [{"casa": idx, "inizio": start_deg} for idx, start_deg in enumerate(case_raw, start=1)]
 
     grafico = {
         "tipo": "tema_polare",
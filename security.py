@@ -50,16 +50,22 @@ def verify_jwt(token: str) -> dict:
     except jwt.PyJWTError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {e}")
 
+def _bearer_token(authorization: str | None) -> str | None:
+    # solo slice: niente lower() dell'intero header né split in lista
+    if not authorization or authorization[:7].lower() != "bearer ":
+        return None
+    return authorization[7:].strip()
+
 def get_user_context_optional(authorization: str | None = Header(None)) -> dict:
-    if not authorization or not authorization.lower().startswith("bearer "):
+    token = _bearer_token(authorization)
+    if token is None:
         return {"sub": "anon", "role": "free"}
-    token = authorization.split(" ", 1)[1].strip()
     claims = verify_jwt(token)
     return {"sub": claims["sub"], "role": claims.get("role", "free"), "claims": claims}
 
 def get_user_context_required(authorization: str | None = Header(None)) -> dict:
-    if not authorization or not authorization.lower().startswith("bearer "):
+    token = _bearer_token(authorization)
+    if token is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Bearer token")
-    token = authorization.split(" ", 1)[1].strip()
     claims = verify_jwt(token)
     return {"sub": claims["sub"], "role": claims.get("role", "free"), "claims": claims}
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import math
+
+import pytest
+
+from astrobot_core_BACKUP import calcoli
+
+EPS = calcoli.OBLIQUITA_RAD
+
+# emisfero sud, equatore, Italia, ~60°N
+LATITUDINI = [-45.0, -33.87, 0.0, 41.9, 59.91]
+LST_GRADI = [i * 15.0 + 7.5 for i in range(24)]
+
+
+def _alt_e_angolo_orario(lon_ecl: float, lst: float, phi: float):
+    """Altezza e angolo orario (radianti) di un punto dell'eclittica (beta = 0)."""
+    ra = math.atan2(math.sin(lon_ecl) * math.cos(EPS), math.cos(lon_ecl))
+    dec = math.asin(math.sin(lon_ecl) * math.sin(EPS))
+    h = lst - ra
+    sin_alt = math.sin(phi) * math.sin(dec) + math.cos(phi) * math.cos(dec) * math.cos(h)
+    return math.asin(sin_alt), h
+
+
+@pytest.mark.parametrize("lat", LATITUDINI)
+@pytest.mark.parametrize("lst_deg", LST_GRADI)
+def test_asc_sorge_a_est(lat, lst_deg):
+    lst, phi = math.radians(lst_deg), math.radians(lat)
+    asc, _ = calcoli._asc_mc_rad(lst, phi)
+
+    alt, h = _alt_e_angolo_orario(asc, lst, phi)
+    assert abs(math.degrees(alt)) < 1e-9
+    # a est (sorge): angolo orario negativo
+    assert math.sin(h) < 0
+
+
+@pytest.mark.parametrize("lat", LATITUDINI)
+@pytest.mark.parametrize("lst_deg", LST_GRADI)
+def test_mc_formula(lat, lst_deg):
+    lst = math.radians(lst_deg)
+    _, mc = calcoli._asc_mc_rad(lst, math.radians(lat))
+
+    atteso = math.atan2(math.sin(lst), math.cos(lst) * math.cos(EPS))
+    assert math.isclose(mc, atteso, abs_tol=1e-12)
+    # il MC culmina: angolo orario nullo
+    _, h = _alt_e_angolo_orario(mc, lst, math.radians(lat))
+    assert abs(math.sin(h)) < 1e-9
@@ -0,0 +1,46 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+
+import pytest
+
+from astrobot_core_BACKUP import transiti
+
+
+@pytest.fixture
+def tema_ctx(monkeypatch):
+    # ASC fisso: niente geocoding in rete durante i test
+    monkeypatch.setattr(
+        transiti, "calcola_asc_mc_case", lambda *a, **k: {"ASC": 203.17, "MC": 115.42}
+    )
+    return transiti.prepara_tema_natale("Napoli", "1986-07-19", "08:50")
+
+
+def _settimane(start: datetime, n: int, passo_giorni: int):
+    return [start + timedelta(days=i * passo_giorni, hours=i % 5) for i in range(n)]
+
+
+@pytest.mark.parametrize(
+    "whens, kwargs",
+    [
+        (_settimane(datetime(2025, 11, 3, 12), 7, 1), {"use_case": "weekly"}),
+        (_settimane(datetime(2025, 1, 1, 12), 5, 7), {"use_case": "monthly"}),
+        (_settimane(datetime(2025, 1, 6, 12), 52, 7), {"use_case": "yearly"}),
+        (
+            _settimane(datetime(2024, 2, 26, 6), 10, 3),
+            {
+                "include_lilith": False,
+                "filtra_transito": ["Sole", "Marte", "Saturno", "Nodo"],
+                "filtra_natal": ["Luna", "Venere", "Ascendente"],
+                "profilo_natale": {"Luna": 1.2, "Venere": 0.8},
+            },
+        ),
+    ],
+)
+def test_batch_come_snapshot_singoli(tema_ctx, whens, kwargs):
+    batch = transiti.transiti_vs_tema_batch(tema_ctx, whens, **kwargs)
+    singoli = [transiti.transiti_vs_tema_precalc(tema_ctx, q, **kwargs) for q in whens]
+    assert batch == singoli
+
+
+def test_batch_vuoto(tema_ctx):
+    assert transiti.transiti_vs_tema_batch(tema_ctx, []) == []